@@ -0,0 +1,79 @@
+"""Local push channel from webhook.py to bot.py.
+
+webhook.py sends a datagram to a Unix socket after each journal flush, and
+bot.py wakes as soon as one arrives instead of waiting out its sleep. The
+journals stay the source of truth: if bot.py is not listening or a datagram
+is dropped, the alert is still picked up from disk on the next tick.
+"""
+import json
+import os
+import select
+import socket
+import time
+
+ALERT_SOCKET = '/tmp/lux_alerts.sock'
+MAX_DATAGRAM = 60000  # Stay under the default Unix datagram size limit
+DEBOUNCE = 0.2  # Seconds to keep collecting after the first push, so bursts wake the bot once
+
+
+class AlertPublisher:
+    """Fire-and-forget sender; never blocks or raises on the webhook side"""
+
+    def __init__(self, path=ALERT_SOCKET):
+        self.path = path
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.setblocking(False)
+
+    def publish(self, prefix, alerts):
+        message = json.dumps({'prefix': prefix, 'count': len(alerts), 'alerts': alerts}).encode()
+        if len(message) > MAX_DATAGRAM:
+            message = json.dumps({'prefix': prefix, 'count': len(alerts), 'alerts': []}).encode()
+        try:
+            self.sock.sendto(message, self.path)
+        except OSError:
+            pass  # No subscriber, or its buffer is full; the journal has the alert
+
+
+class AlertSubscriber:
+    """Binds the push socket for bot.py"""
+
+    def __init__(self, path=ALERT_SOCKET):
+        self.path = path
+        if os.path.exists(path):
+            os.unlink(path)  # Left behind by a previous run
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+        self.sock.bind(path)
+        self.sock.setblocking(False)
+
+    def _drain(self):
+        messages = []
+        while True:
+            try:
+                data = self.sock.recv(MAX_DATAGRAM)
+            except BlockingIOError:
+                return messages
+            try:
+                messages.append(json.loads(data))
+            except ValueError:
+                continue
+
+    def wait(self, timeout):
+        """Block up to timeout seconds; return pushed messages (empty list on timeout)"""
+        ready, _, _ = select.select([self.sock], [], [], max(timeout, 0))
+        if not ready:
+            return []
+        messages = self._drain()
+        deadline = time.monotonic() + DEBOUNCE
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([self.sock], [], [], remaining)
+            if ready:
+                messages.extend(self._drain())
+        return messages
+
+    def close(self):
+        self.sock.close()
+        if os.path.exists(self.path):
+            os.unlink(self.path)
@@ -0,0 +1,123 @@
+"""Fixed-memory ring buffer of 1-min bars with zero-copy NumPy views.
+
+Every column is one preallocated array of twice the capacity, and each row is
+written at i and i + capacity. The newest n rows are therefore always a
+single contiguous slice, and tail(n) returns views instead of copies however
+the ring has wrapped. Timestamps are int64 epoch seconds of the bar's
+wall-clock time (as in market_store); prices are float64, while volume and
+the derived indicator columns are float32. Memory is fixed at construction:
+once the ring is full, each new bar evicts the oldest one.
+"""
+import numpy as np
+
+BAR_COLUMNS = {
+    'timestamp': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float32,
+}
+DERIVED_COLUMNS = ('vwap', 'rsi', 'macd', 'macd_signal', 'atr', 'ema_21')
+CAPACITY = 30 * 960  # 30 days of 04:00-20:00 bars (bar_store's lookback)
+
+
+class BarRing:
+    def __init__(self, capacity=CAPACITY, derived=DERIVED_COLUMNS):
+        self.capacity = capacity
+        self.dtypes = dict(BAR_COLUMNS, **{name: np.float32 for name in derived})
+        self.columns = {name: np.empty(2 * capacity, dtype=dtype) for name, dtype in self.dtypes.items()}
+        self.clear()
+
+    def clear(self):
+        self.length = 0
+        self._end = 0  # Physical row after the newest bar, in [0, capacity)
+
+    def __len__(self):
+        return self.length
+
+    @property
+    def nbytes(self):
+        """Memory held by the ring; fixed for its lifetime"""
+        return sum(column.nbytes for column in self.columns.values())
+
+    def last_timestamp(self):
+        return int(self.columns['timestamp'][self._end + self.capacity - 1]) if self.length else None
+
+    def _physical(self, rows):
+        """Physical rows (first copy) of logical rows counted from the oldest bar"""
+        return (self._end - self.length + np.asarray(rows)) % self.capacity
+
+    def _write(self, name, physical, values):
+        column = self.columns[name]
+        column[physical] = values
+        column[physical + self.capacity] = values
+
+    def upsert(self, timestamps, values):
+        """Write bars keyed by timestamp: existing timestamps are overwritten in
+        place, newer ones are appended (evicting the oldest once full).
+        timestamps must be sorted ascending; values maps each OHLCV column to an
+        array aligned with timestamps. Derived columns of written rows are reset
+        to NaN until set_derived() fills them again."""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if not len(timestamps):
+            return
+        stored = self.columns['timestamp'][self._end + self.capacity - self.length:self._end + self.capacity]
+        last = stored[-1] if self.length else np.iinfo(np.int64).min
+        newer = timestamps > last
+        # Corrections to bars already held (older than the ring's reach are dropped)
+        old = np.nonzero(~newer)[0]
+        if len(old):
+            pos = np.searchsorted(stored, timestamps[old])
+            found = pos < self.length
+            found[found] &= stored[pos[found]] == timestamps[old[found]]
+            physical = self._physical(pos[found])
+            for name in self.dtypes:
+                if name in BAR_COLUMNS:
+                    if name != 'timestamp':
+                        self._write(name, physical, np.asarray(values[name])[old[found]])
+                else:
+                    self._write(name, physical, np.nan)
+        new = np.nonzero(newer)[0][-self.capacity:]
+        if len(new):
+            physical = (self._end + np.arange(len(new))) % self.capacity
+            for name in self.dtypes:
+                if name == 'timestamp':
+                    self._write(name, physical, timestamps[new])
+                elif name in BAR_COLUMNS:
+                    self._write(name, physical, np.asarray(values[name])[new])
+                else:
+                    self._write(name, physical, np.nan)
+            self._end = (self._end + len(new)) % self.capacity
+            self.length = min(self.length + len(new), self.capacity)
+
+    def tail(self, n=None):
+        """Read-only column views of the newest n bars (all by default), oldest first"""
+        n = self.length if n is None else min(n, self.length)
+        stop = self._end + self.capacity
+        views = {}
+        for name, column in self.columns.items():
+            view = column[stop - n:stop]
+            view.flags.writeable = False
+            views[name] = view
+        return views
+
+    def __getitem__(self, name):
+        """Read-only view of one column over all held bars, oldest first"""
+        stop = self._end + self.capacity
+        view = self.columns[name][stop - self.length:stop]
+        view.flags.writeable = False
+        return view
+
+    def since(self, timestamp):
+        """Column views of the bars with timestamp >= timestamp"""
+        if timestamp is None:
+            return self.tail()
+        return self.tail(self.length - int(np.searchsorted(self['timestamp'], timestamp)))
+
+    def set_derived(self, name, values):
+        """Fill a derived column for the newest len(values) bars"""
+        values = np.asarray(values, dtype=self.dtypes[name])
+        n = min(len(values), self.length)
+        if n:
+            self._write(name, self._physical(np.arange(self.length - n, self.length)), values[-n:])
@@ -0,0 +1,103 @@
+"""Persistent per-(symbol, interval) bar cache for Tradier history.
+
+Bars are served from memory and mirrored to bars_<symbol>_<interval>.jsonl.
+Each refresh asks Tradier only for bars since the last stored one and
+replaces that last bar, which may still have been forming when it was fetched.
+"""
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+
+LOOKBACK_DAYS = 30
+
+
+class BarCache:
+    """fetch(symbol, interval, start, end) returns a list of bar dicts
+    (date, open, high, low, close, volume) or None on failure."""
+
+    def __init__(self, fetch, base_dir='.', lookback_days=LOOKBACK_DAYS):
+        self.fetch = fetch
+        self.base_dir = base_dir
+        self.lookback_days = lookback_days
+        self._bars = {}  # (symbol, interval) -> bars sorted by date
+        self._locks = {}  # (symbol, interval) -> lock held while that key refreshes
+        self._lock = threading.Lock()  # Guards _locks
+
+    def _path(self, symbol, interval):
+        safe = symbol.replace('^', '').replace('/', '_')
+        return os.path.join(self.base_dir, f'bars_{safe}_{interval}.jsonl')
+
+    def _cutoff(self):
+        return (datetime.now().date() - timedelta(days=self.lookback_days)).strftime('%Y-%m-%d')
+
+    def _load(self, symbol, interval):
+        """Read the store once, keeping the last copy of each bar, and compact it"""
+        path = self._path(symbol, interval)
+        by_date = {}
+        try:
+            with open(path, 'r') as f:
+                for line in f:
+                    try:
+                        bar = json.loads(line)
+                    except ValueError:
+                        continue  # Partially written last line
+                    by_date[bar['date']] = bar
+        except FileNotFoundError:
+            pass
+        cutoff = self._cutoff()
+        bars = [by_date[d] for d in sorted(by_date) if d >= cutoff]
+        self._rewrite(path, bars)
+        return bars
+
+    def _rewrite(self, path, bars):
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as f:
+            f.writelines(json.dumps(b) + '\n' for b in bars)
+        os.replace(tmp, path)
+
+    def _merge(self, bars, new_bars):
+        """Replace the last stored bar and append newer ones; returns bars that changed"""
+        changed = []
+        for bar in sorted(new_bars, key=lambda b: b['date']):
+            if bars and bar['date'] < bars[-1]['date']:
+                continue  # Already final
+            if bars and bar['date'] == bars[-1]['date']:
+                if bar != bars[-1]:
+                    bars[-1] = bar
+                    changed.append(bar)
+            else:
+                bars.append(bar)
+                changed.append(bar)
+        return changed
+
+    def _key_lock(self, key):
+        with self._lock:
+            lock = self._locks.get(key)
+            if lock is None:
+                lock = self._locks[key] = threading.Lock()
+            return lock
+
+    def get(self, symbol, interval):
+        """Refresh from the last stored bar and return all cached bars.
+        Different symbols and intervals refresh concurrently."""
+        key = (symbol, interval)
+        with self._key_lock(key):
+            bars = self._bars.get(key)
+            if bars is None:
+                bars = self._bars[key] = self._load(symbol, interval)
+            if bars:
+                start = datetime.fromisoformat(bars[-1]['date']).strftime('%Y-%m-%d %H:%M')
+            else:
+                start = self._cutoff()
+            new_bars = self.fetch(symbol, interval, start, datetime.now().strftime('%Y-%m-%d %H:%M'))
+            if new_bars:
+                changed = self._merge(bars, new_bars)
+                if changed:
+                    with open(self._path(symbol, interval), 'a') as f:
+                        f.writelines(json.dumps(b) + '\n' for b in changed)
+            cutoff = self._cutoff()
+            if bars and bars[0]['date'] < cutoff:
+                bars[:] = [b for b in bars if b['date'] >= cutoff]
+                self._rewrite(self._path(symbol, interval), bars)
+            return list(bars)
@@ -0,0 +1,171 @@
+"""Benchmark bot.py's per-tick math and webhook.py's alert ingestion.
+
+Run from the repo root:
+    python benchmarks/bench_pipeline.py            # all sizes, saved to benchmarks/results/
+    python benchmarks/bench_pipeline.py --quick    # smallest sizes only
+
+Bars: 1, 30 and 90 days of synthetic 1-min bars in a BarRing. 'cold' is the
+first tick (fresh engines over the whole history), 'tick' a steady-state tick
+(warm engines, newest bar revised); bars/ compares building a DataFrame from
+the cached bar list with writing the newest bar to the ring, timeframes/ is
+deriving 3min-1h bars from the ring; candle_patterns is the per-tick scan of
+the newest bars, candle_scan_full every bar of the history. Alerts: day files of 100, 1k and 10k alerts
+through parse_payload, save_alert (queued and flushed to a temp journal)
+and the bot's AlertIndex read. Each run is compared with the previous one.
+"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, REPO)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import record  # noqa: E402
+
+BAR_DAYS = (1, 30, 90)
+ALERT_COUNTS = (100, 1000, 10000)
+BARS_PER_DAY = 390
+
+
+def make_bars(days, rng):
+    """Session-hours 1-min bars in Tradier's columns"""
+    sessions = pd.bdate_range(end='2025-12-05', periods=days)
+    index = pd.DatetimeIndex(np.concatenate([pd.date_range(d + pd.Timedelta('09:30:00'), periods=BARS_PER_DAY, freq='1min') for d in sessions]))
+    n = len(index)
+    close = 450 + np.cumsum(rng.normal(0, 0.15, n))
+    open_ = np.r_[close[0], close[:-1]]
+    return pd.DataFrame({
+        'date': index.strftime('%Y-%m-%dT%H:%M:%S'),
+        'open': open_,
+        'high': np.maximum(open_, close) + rng.random(n) * 0.1,
+        'low': np.minimum(open_, close) - rng.random(n) * 0.1,
+        'close': close,
+        'volume': rng.integers(10_000, 100_000, n).astype(float),
+    })
+
+
+def make_alert(i, rng):
+    """A TradingView-shaped LuxAlgo alert"""
+    price = 450 + rng.normal(0, 1)
+    return {
+        'alert': ['Bullish Trend', 'Bearish Trend', 'Bullish Exit', 'Within Bullish Block'][i % 4],
+        'ticker': 'SPY',
+        'tf': ['1', '3', '5', '15', '30'][i % 5],
+        'bartime': 1764945000000 + i * 60000,
+        'ohlcv': {'open': price, 'high': price + 0.2, 'low': price - 0.2, 'close': price + 0.1, 'volume': 12345},
+    }
+
+
+def bench_bars(days_list, repeat):
+    import bot
+    from bar_ring import BarRing
+    from candles import scan
+    from timeframes import TimeframeAggregator
+
+    rng = np.random.default_rng(0)
+    cases = {}
+    for days in days_list:
+        df = make_bars(days, rng)
+        records = df.to_dict('records')  # As the bar cache hands them over
+        ring = BarRing(capacity=len(df))
+        ring.upsert(*bot.bar_arrays(records))
+
+        def ring_update():
+            ring.upsert(*bot.bar_arrays(records, ring.last_timestamp()))
+
+        def cold_vwap():
+            bot.vwap_engines.clear()
+            bot.compute_anchored_vwap(ring)
+
+        def cold_indicators():
+            bot.indicator_engines.clear()
+            bot.compute_indicators(ring)
+
+        cases[f'bars/dataframe/{days}d'] = record.measure(lambda: pd.DataFrame(records), max(3, repeat // 10))
+        cases[f'bars/ring_update/{days}d'] = record.measure(ring_update, repeat)
+        cases[f'vwap/cold/{days}d'] = record.measure(cold_vwap, max(3, repeat // 10))
+        cases[f'vwap/tick/{days}d'] = record.measure(lambda: bot.compute_anchored_vwap(ring), repeat)
+        cases[f'indicators/cold/{days}d'] = record.measure(cold_indicators, max(3, repeat // 10))
+        cases[f'indicators/tick/{days}d'] = record.measure(lambda: bot.compute_indicators(ring), repeat)
+        cases[f'timeframes/cold/{days}d'] = record.measure(lambda: TimeframeAggregator().update(ring), max(3, repeat // 10))
+        aggregator = TimeframeAggregator().update(ring)
+        cases[f'timeframes/tick/{days}d'] = record.measure(lambda: aggregator.update(ring), repeat)
+        cases[f'trend_channel/{days}d'] = record.measure(lambda: bot.calculate_trend_channel(ring), repeat)
+        cases[f'candle_patterns/{days}d'] = record.measure(lambda: bot.get_candle_patterns(aggregator), repeat)
+        cases[f'candle_scan_full/{days}d'] = record.measure(lambda: scan(ring['open'], ring['high'], ring['low'], ring['close']), max(3, repeat // 10))
+    return cases
+
+
+def bench_alerts(counts, base_dir):
+    import webhook
+    from journal import AlertIndex, AlertJournal, AlertWriter
+
+    rng = np.random.default_rng(0)
+    cases = {}
+    for count in counts:
+        raws = [json.dumps(make_alert(i, rng)).encode() for i in range(count)]
+        day_dir = os.path.join(base_dir, str(count))
+        os.makedirs(day_dir)
+        webhook.writer = AlertWriter(AlertJournal(day_dir)).start()
+
+        parsed, parse_ms, save_ms = [], [], []
+        for raw in raws:
+            with webhook.app.test_request_context('/lux_oscillator', method='POST', data=raw):
+                start = time.perf_counter()
+                parsed.append(webhook.parse_payload())
+                parse_ms.append((time.perf_counter() - start) * 1000)
+        start_all = time.perf_counter()
+        for data in parsed:
+            start = time.perf_counter()
+            webhook.save_alert(data, 'lux_oscillator')
+            save_ms.append((time.perf_counter() - start) * 1000)
+        webhook.writer.stop()
+        flushed_ms = (time.perf_counter() - start_all) * 1000
+
+        parse_ms.sort()
+        save_ms.sort()
+        cases[f'parse_payload/{count}'] = {'median_ms': record.percentile(parse_ms, 0.5), 'p99_ms': record.percentile(parse_ms, 0.99)}
+        cases[f'save_alert/{count}'] = {'median_ms': record.percentile(save_ms, 0.5), 'p99_ms': record.percentile(save_ms, 0.99),
+                                        'all_on_disk_ms': flushed_ms}
+        index = AlertIndex(['lux_oscillator'], day_dir)
+        start = time.perf_counter()
+        index.refresh()
+        cases[f'alert_index_read/{count}'] = {'median_ms': (time.perf_counter() - start) * 1000}
+    return cases
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--quick', action='store_true', help='Smallest sizes only')
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+    days_list = BAR_DAYS[:1] if args.quick else BAR_DAYS
+    counts = ALERT_COUNTS[:1] if args.quick else ALERT_COUNTS
+
+    with tempfile.TemporaryDirectory() as scratch:
+        cwd = os.getcwd()
+        os.chdir(scratch)  # bot.py/webhook.py create their working files on import
+        try:
+            with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+                cases = bench_bars(days_list, args.repeat)
+                cases.update(bench_alerts(counts, scratch))
+        finally:
+            os.chdir(cwd)
+
+    for name, values in cases.items():
+        print(f"{name:<32} " + '  '.join(f"{k} {v:9.3f}" for k, v in values.items()))
+    record.compare(record.previous('pipeline'), cases, 'median_ms')
+    if not args.no_save:
+        print(f"\nSaved to {record.save('pipeline', cases, quick=args.quick)}")
+
+
+if __name__ == '__main__':
+    main()
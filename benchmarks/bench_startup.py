@@ -0,0 +1,80 @@
+"""Benchmark bot.py's startup: a cold `import bot` in a fresh interpreter.
+
+Run from the repo root:
+    python benchmarks/bench_startup.py             # 5 cold imports, saved to benchmarks/results/
+    python benchmarks/bench_startup.py --repeat 10
+
+Reports the median/worst import time against bot.STARTUP_BUDGET and the
+slowest top-level imports (python -X importtime), so a new eager dependency
+shows up here before it shows up as a late first tick after a restart. Each
+run is compared with the previous one.
+"""
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+
+REPO = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import record  # noqa: E402
+
+IMPORT = ("import sys, time; sys.path.insert(0, {repo!r}); start = time.perf_counter(); import bot; "
+          "print(time.perf_counter() - start, bot.STARTUP_BUDGET, ' '.join(m for m in ('bs4', 'lxml', 'pandas') if m in sys.modules))")
+TOP = 10  # Slowest imports listed
+
+
+def cold_import(scratch, importtime=False):
+    """One fresh interpreter importing bot (in scratch, so it reads no live position or scrape cache)"""
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', IMPORT.format(repo=os.path.abspath(REPO))]
+    done = subprocess.run(command, cwd=scratch, capture_output=True, text=True, check=True)
+    seconds, budget, *eager = done.stdout.split()
+    return float(seconds), float(budget), eager, done.stderr
+
+
+def slowest_imports(importtime_log, top=TOP):
+    """[(ms, module)] of bot's direct imports with the largest cumulative time"""
+    rows = []
+    for line in importtime_log.splitlines():
+        match = re.match(r'import time:\s+\d+ \|\s+(\d+) \|( *)(\S+)', line)
+        if not match:
+            continue
+        depth = len(match.group(2)) // 2  # Children are logged before their parent
+        if depth == 1:
+            rows.append((int(match.group(1)) / 1000, match.group(3)))
+        elif depth == 0:
+            if match.group(3) == 'bot':
+                return sorted(rows, reverse=True)[:top]
+            rows = []  # Interpreter startup (site, encodings, ...)
+    return []
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch:
+        cold_import(scratch)  # Warm the OS file cache: a restart rarely reads from cold disk
+        samples = [cold_import(scratch)[0] * 1000 for _ in range(args.repeat)]
+        _, budget, eager, log = cold_import(scratch, importtime=True)
+
+    samples.sort()
+    cases = {'import_bot': {'median_ms': statistics.median(samples), 'max_ms': samples[-1], 'budget_ms': budget * 1000}}
+    print(f"import bot: median {cases['import_bot']['median_ms']:.0f} ms, worst {samples[-1]:.0f} ms "
+          f"(budget {budget * 1000:.0f} ms{', OVER' if samples[-1] > budget * 1000 else ''})")
+    if eager:
+        print(f"Loaded at import though only scraping needs them: {', '.join(eager)}")
+    print("\nSlowest imports (cumulative):")
+    for ms, module in slowest_imports(log):
+        print(f"  {module:<32} {ms:8.1f} ms")
+    record.compare(record.previous('startup'), cases, 'median_ms')
+    if not args.no_save:
+        print(f"\nSaved to {record.save('startup', cases, repeat=args.repeat)}")
+
+
+if __name__ == '__main__':
+    main()
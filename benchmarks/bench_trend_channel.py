@@ -0,0 +1,70 @@
+"""Benchmark the batched NumPy trend channels against per-call scipy linregress.
+
+Run from the repo root:  python benchmarks/bench_trend_channel.py
+scipy is only needed here, for the reference implementation.
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+from scipy.stats import linregress
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+from channels import trend_channels  # noqa: E402
+
+TIMEFRAMES = {'1min': 11700, '30min': 390}  # ~30 days of bars
+PERIOD = 20
+
+
+def linregress_channel(df, period=PERIOD):
+    """The previous calculate_trend_channel, kept as the reference"""
+    df = df.tail(period)
+    x = np.arange(len(df))
+    slope_high, intercept_high, _, _, _ = linregress(x, df['high'])
+    upper = slope_high * x + intercept_high
+    slope_low, intercept_low, _, _, _ = linregress(x, df['low'])
+    lower = slope_low * x + intercept_low
+    slope_close, _, _, _, _ = linregress(x, df['close'])
+    current_price = df['close'].iloc[-1]
+    if slope_close > 0:
+        channel_type = 'bullish'
+    elif slope_close < 0:
+        channel_type = 'bearish'
+    else:
+        channel_type = 'neutral'
+    if current_price > upper[-1]:
+        return f'exited above {channel_type} channel'
+    elif current_price < lower[-1]:
+        return f'exited below {channel_type} channel'
+    return f'within {channel_type} channel'
+
+
+def make_bars(n, rng):
+    close = 400 + np.cumsum(rng.normal(0, 0.2, n))
+    return pd.DataFrame({'high': close + rng.random(n) * 0.3, 'low': close - rng.random(n) * 0.3, 'close': close})
+
+
+def main(repeat=200):
+    rng = np.random.default_rng(0)
+    frames = {tf: make_bars(n, rng) for tf, n in TIMEFRAMES.items()}
+    arrays = {tf: (df['high'].to_numpy(), df['low'].to_numpy(), df['close'].to_numpy()) for tf, df in frames.items()}
+
+    mismatches = 0
+    for trial in range(200):
+        sample = {tf: make_bars(PERIOD + trial % 7, rng) for tf in TIMEFRAMES}
+        batched = trend_channels({tf: (df['high'], df['low'], df['close']) for tf, df in sample.items()}, (PERIOD,))
+        mismatches += sum(batched[tf][PERIOD] != linregress_channel(df) for tf, df in sample.items())
+    print(f"status mismatches vs linregress: {mismatches}")
+
+    old = timeit.timeit(lambda: [linregress_channel(df) for df in frames.values()], number=repeat) / repeat
+    new = timeit.timeit(lambda: trend_channels(arrays, (PERIOD,)), number=repeat) / repeat
+    multi = timeit.timeit(lambda: trend_channels(arrays, (10, 20, 50, 100)), number=repeat) / repeat
+    print(f"linregress, {len(frames)} timeframes x 1 window: {old * 1e6:9.1f} us")
+    print(f"batched,    {len(frames)} timeframes x 1 window: {new * 1e6:9.1f} us  ({old / new:.1f}x)")
+    print(f"batched,    {len(frames)} timeframes x 4 windows: {multi * 1e6:9.1f} us")
+
+
+if __name__ == '__main__':
+    main()
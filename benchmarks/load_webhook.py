@@ -0,0 +1,140 @@
+"""Load generator for webhook.py's four alert routes.
+
+Run from the repo root:
+    python benchmarks/load_webhook.py                       # in-process server, temp journal
+    python benchmarks/load_webhook.py --requests 20000 --concurrency 16
+    python benchmarks/load_webhook.py --url http://127.0.0.1:8080   # a running server
+
+Posts TradingView-shaped payloads (JSON, plus some plain-text alerts that take
+the fallback path) round-robin to /lux_oscillator, /lux_price_action,
+/lux_trendcatcher and /lux_exits, and reports throughput and p50/p99 latency
+per route. A running server must allow the client's IP. Results are saved to
+benchmarks/results/ and compared with the previous run.
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import sys
+import tempfile
+import threading
+import time
+
+import numpy as np
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import record  # noqa: E402
+from bench_pipeline import make_alert  # noqa: E402
+
+ROUTES = ('lux_oscillator', 'lux_price_action', 'lux_trendcatcher', 'lux_exits')
+PLAIN_TEXT_EVERY = 10  # Every Nth payload is a bare string, like some LuxAlgo alerts
+
+
+@contextlib.contextmanager
+def local_server(journal_dir):
+    """webhook.app on a free local port, journaling to journal_dir and accepting localhost"""
+    from werkzeug.serving import make_server
+    import webhook
+    from journal import AlertJournal, AlertWriter
+
+    webhook.writer = AlertWriter(AlertJournal(journal_dir)).start()
+    webhook.ALLOWED_IPS = webhook.ALLOWED_IPS | {'127.0.0.1'}
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)  # No access log line per request
+    server = make_server('127.0.0.1', 0, webhook.app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f'http://127.0.0.1:{server.server_port}'
+    finally:
+        server.shutdown()
+        webhook.writer.stop()
+
+
+def payloads(count):
+    rng = np.random.default_rng(0)
+    bodies = []
+    for i in range(count):
+        if i % PLAIN_TEXT_EVERY == PLAIN_TEXT_EVERY - 1:
+            bodies.append((b'Within Bullish Block', 'text/plain'))
+        else:
+            bodies.append((json.dumps(make_alert(i, rng)).encode(), 'application/json'))
+    return bodies
+
+
+def run_load(url, total, concurrency):
+    """Post total payloads from concurrency threads; {route: [latency ms]}, errors, seconds"""
+    bodies = payloads(total)
+    latencies = {route: [] for route in ROUTES}
+    errors = {route: 0 for route in ROUTES}
+    lock = threading.Lock()
+    cursor = iter(range(total))
+
+    def worker():
+        session = requests.Session()
+        while True:
+            with lock:
+                i = next(cursor, None)
+            if i is None:
+                return
+            route = ROUTES[i % len(ROUTES)]
+            body, content_type = bodies[i]
+            start = time.perf_counter()
+            try:
+                ok = session.post(f'{url}/{route}', data=body, headers={'Content-Type': content_type}, timeout=10).ok
+            except requests.RequestException:
+                ok = False
+            elapsed = (time.perf_counter() - start) * 1000
+            with lock:
+                latencies[route].append(elapsed)
+                errors[route] += not ok
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, errors, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the webhook alert routes')
+    parser.add_argument('--url', help='Target a running server instead of an in-process one')
+    parser.add_argument('--requests', type=int, default=4000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--no-save', action='store_true')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as scratch, contextlib.ExitStack() as stack:
+        url = args.url
+        if not url:
+            cwd = os.getcwd()
+            os.chdir(scratch)
+            stack.callback(os.chdir, cwd)
+            stack.enter_context(contextlib.redirect_stdout(open(os.devnull, 'w')))
+            url = stack.enter_context(local_server(scratch))
+        latencies, errors, seconds = run_load(url, args.requests, args.concurrency)
+
+    cases = {}
+    for route in ROUTES + ('all',):
+        values = sorted(sum(latencies.values(), []) if route == 'all' else latencies[route])
+        failed = sum(errors.values()) if route == 'all' else errors[route]
+        cases[route] = {
+            'requests': len(values),
+            'errors': failed,
+            'throughput_rps': len(values) / seconds,
+            'p50_ms': record.percentile(values, 0.5),
+            'p99_ms': record.percentile(values, 0.99),
+        }
+        print(f"{route:<18} {len(values):6d} req  {failed:4d} errors  {cases[route]['throughput_rps']:8.1f} req/s  "
+              f"p50 {cases[route]['p50_ms']:7.2f} ms  p99 {cases[route]['p99_ms']:7.2f} ms")
+    record.compare(record.previous('load_webhook'), cases, 'p99_ms')
+    if not args.no_save:
+        print(f"\nSaved to {record.save('load_webhook', cases, url=args.url or 'in-process', concurrency=args.concurrency)}")
+
+
+if __name__ == '__main__':
+    main()
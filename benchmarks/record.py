@@ -0,0 +1,62 @@
+"""Saving benchmark results and comparing them with the previous run.
+
+Each run is written to benchmarks/results/<suite>_<timestamp>.json holding
+{case: {metric: value}}; compare() prints the change of every metric against
+the newest earlier file of the same suite.
+"""
+import glob
+import json
+import os
+import platform
+import statistics
+import time
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+def measure(fn, repeat, number=1):
+    """Run fn number times per sample, repeat samples; ms per call"""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number * 1000)
+    samples.sort()
+    return {'median_ms': statistics.median(samples), 'min_ms': samples[0], 'p99_ms': percentile(samples, 0.99)}
+
+
+def percentile(sorted_values, q):
+    return sorted_values[min(int(q * len(sorted_values)), len(sorted_values) - 1)] if sorted_values else 0.0
+
+
+def previous(suite):
+    paths = sorted(glob.glob(os.path.join(RESULTS_DIR, f'{suite}_*.json')))
+    if not paths:
+        return None
+    with open(paths[-1], 'r') as f:
+        return json.load(f)
+
+
+def save(suite, cases, **info):
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    path = os.path.join(RESULTS_DIR, f"{suite}_{time.strftime('%Y%m%d-%H%M%S')}.json")
+    with open(path, 'w') as f:
+        json.dump(dict(info, suite=suite, python=platform.python_version(), machine=platform.node(),
+                       time=time.strftime('%Y-%m-%d %H:%M:%S'), cases=cases), f, indent=1)
+    return path
+
+
+def compare(before, cases, metric):
+    """Print metric per case against an earlier run (lower is better for times)"""
+    if not before:
+        print("No previous run to compare with")
+        return
+    print(f"\nvs {before['time']} ({metric}):")
+    for name, values in cases.items():
+        old = before['cases'].get(name, {}).get(metric)
+        new = values.get(metric)
+        if old is None or new is None:
+            continue
+        change = (new - old) / old * 100 if old else 0.0
+        print(f"  {name:<40} {old:10.3f} -> {new:10.3f}  ({change:+.1f}%)")
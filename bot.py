@@ -1,14 +1,32 @@
-import requests
-import pandas as pd
-import numpy as np
-from datetime import datetime, timedelta
 import time
+IMPORT_START = time.perf_counter()  # Startup is measured from here to the scheduler starting
+
+import numpy as np
+from datetime import datetime
 import json
-import pandas_ta as ta  # Correct import for pandas_ta
-from bs4 import BeautifulSoup
 import re
-from scipy.stats import linregress
-import os
+import atexit
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+import http_client
+from alert_push import AlertSubscriber
+from bar_ring import BarRing
+from bar_store import BarCache
+from candles import describe, scan_frames
+from channels import trend_channels
+from decision_cache import DecisionCache, decision_key
+from dispatch import OutboundDispatcher
+from gather import InputGatherer
+from indicators import AnchoredVWAP, StreamingIndicators
+from journal import AlertIndex
+from market_store import ColumnStore, to_date, to_dates, to_epoch
+from metrics import Timings, write_summary
+from prompt_context import compact_alerts, fit_prompt
+from scheduler import TickScheduler
+from scrape_cache import ScrapeCache
+from timeframes import TimeframeAggregator
 
 # Placeholders for API keys - user must fill these
 TRADIER_TOKEN = 'YOUR_TRADIER_ACCESS_TOKEN'  # Get from https://tradier.com/
@@ -16,312 +34,405 @@ XAI_API_KEY = 'YOUR_XAI_API_KEY'  # From https://x.ai/api
 DISCORD_WEBHOOK = 'https://discord.com/api/webhooks/1444530076145160305/Nlfk_97ZfXpavKxbHz4B0uF0odbbKcTRjO18gRPFm52LX2_8s7-HQNI1ZaE8HbHfvSPz'
 TRADERSPOST_WEBHOOK = 'https://webhooks.traderspost.io/trading/webhook/30aa3729-a189-4dda-8ddf-62d7fba63ac0/a5011e30a9f047f18fa12645953663d9'
 
-# Headers for Tradier API
+# Tradier API (point TRADIER_BASE_URL at a local stub server for testing)
+TRADIER_BASE_URL = 'https://api.tradier.com/v1'
 tradier_headers = {
     'Authorization': f'Bearer {TRADIER_TOKEN}',
     'Accept': 'application/json'
 }
 
-# Position tracking (simple in-memory; for production, use a file or DB)
-current_position = None  # {'type': 'long' or 'short', 'entry_price': float, 'contracts': 10}
-position_file = 'position.json'  # For persistence across runs
+# Symbols traded; one quotes request per tick covers all of them plus VIX
+SYMBOLS = ['SPY']
+VIX_SYMBOL = '^VIX'
+CONTRACTS = 10
 
-# Market data storage
-market_data_file = 'market_data.csv'
+# Position tracking per symbol (simple in-memory; for production, use a file or DB)
+positions = {}  # symbol -> {'type': 'long' or 'short', 'entry_price': float, 'contracts': 10, 'entry_time': str}
+position_file = 'position.json'  # For persistence across runs
 
-# LuxAlgo oscillator alerts daily file
-today_date = datetime.now().strftime('%Y-%m-%d')
-lux_oscillator_file = f'lux_oscillator_{today_date}.json'
-lux_price_action_file = f'lux_price_action_{today_date}.json'
-lux_trendcatcher_file = f'lux_trendcatcher_{today_date}.json'
-lux_exits_file = f'lux_exits_{today_date}.json'
+def market_dirs(symbol):
+    """Store and archive directories: the first symbol keeps the original market_data paths"""
+    if symbol == SYMBOLS[0]:
+        return 'market_data', 'market_data_archive'
+    return f'market_data_{symbol}', f'market_data_archive_{symbol}'
+
+# Market data storage per symbol (memory-mapped columns, archived at end of day);
+# opened by run(), so importing bot creates no directories
+market_stores = {}
+
+def open_market_stores():
+    for symbol in SYMBOLS:
+        if symbol not in market_stores:
+            market_stores[symbol] = ColumnStore(*market_dirs(symbol))
+
+# LuxAlgo alert journals (<prefix>_<date>.jsonl, written by webhook.py)
+lux_oscillator_prefix = 'lux_oscillator'
+lux_price_action_prefix = 'lux_price_action'
+lux_trendcatcher_prefix = 'lux_trendcatcher'
+lux_exits_prefix = 'lux_exits'
+
+# Tails the journals each tick instead of re-reading whole day files; one
+# index per symbol, keeping the alerts whose ticker matches
+alert_prefixes = [lux_oscillator_prefix, lux_price_action_prefix, lux_trendcatcher_prefix, lux_exits_prefix]
+alert_indexes = {symbol: AlertIndex(alert_prefixes, ticker=symbol) for symbol in SYMBOLS}
+
+# Prompt budget: alerts beyond the newest ALERTS_PER_TF per timeframe are
+# summarized, and fewer are kept if the prompt would still exceed the budget
+ALERTS_PER_TF = 3
+PROMPT_MAX_CHARS = 8000
+PROMPT_MAX_TOKENS = 2000
+
+# Ticks fire on 1-min bar closes; session windows and one-shot events are
+# scheduled, and alerts pushed by webhook.py trigger an off-cycle tick
+SESSION_WINDOWS = {
+    'market': ('09:00', '16:00'),
+    'ai': ('09:45', '12:01'),  # AI query window, including the 12:00 bar
+}
+SESSION_EVENTS = {
+    'force_close': ('12:00', False),  # Close any open position at noon ET
+    'market_close': ('16:00', True),  # Archive the day's bars (also on a late start)
+}
 
-def load_position():
+def listen_for_alerts(scheduler):
+    """Trigger an off-cycle tick whenever webhook.py pushes alerts"""
+    try:
+        subscriber = AlertSubscriber()
+    except OSError as e:
+        print(f"Alert push channel unavailable, bar ticks only: {e}")
+        return None
+    def run():
+        while True:
+            messages = subscriber.wait(60)
+            if messages:
+                scheduler.trigger(', '.join(f"{m.get('prefix')} x{m.get('count', 0)}" for m in messages))
+    thread = threading.Thread(target=run, name='alert-listener', daemon=True)
+    thread.start()
+    return thread
+
+def load_positions():
+    """{symbol: position}; a single-position file from before per-symbol positions belongs to the first symbol"""
     try:
         with open(position_file, 'r') as f:
-            return json.load(f)
+            data = json.load(f)
     except (FileNotFoundError, json.decoder.JSONDecodeError, ValueError):
-        return None  # Handle empty/invalid file
-
-def save_position(pos):
+        return {}  # Handle empty/invalid file
+    if not isinstance(data, dict):
+        return {}
+    if 'type' in data:
+        return {SYMBOLS[0]: data}
+    return {symbol: pos for symbol, pos in data.items() if pos}
+
+def save_positions():
     with open(position_file, 'w') as f:
-        json.dump(pos, f)
+        json.dump(positions, f)
 
-current_position = load_position()
+positions = load_positions()
 
-def append_market_data(df_new):
-    """Append new data to daily CSV"""
-    if os.path.exists(market_data_file):
-        df_old = pd.read_csv(market_data_file)
-        df = pd.concat([df_old, df_new]).drop_duplicates(subset='date', keep='last')
-    else:
-        df = df_new
-    df.to_csv(market_data_file, index=False)
+def append_market_data(symbol, timestamps, values):
+    """Upsert today's new and corrected bars into the symbol's market data store"""
+    market_store = market_stores[symbol]
+    # The store is archived as one day, so the rest of a cold start's 30-day history stays out
+    start = int(to_epoch(datetime.now().strftime('%Y-%m-%d')))
+    last = market_store.last_timestamp()
+    if last is not None:
+        start = max(start, last)  # Only the last stored bar can still change
+    keep = timestamps >= start
+    market_store.upsert(timestamps[keep], {col: v[keep] for col, v in values.items()})
 
 def erase_market_data():
-    """Erase market data at end of day"""
-    if os.path.exists(market_data_file):
-        os.remove(market_data_file)
+    """Archive the day's market data and start empty stores"""
+    for market_store in market_stores.values():
+        archived = market_store.rollover()
+        if archived:
+            print(f"Market data archived to {archived}")
 
 def get_tradier_quotes(symbols):
-    """Fetch real-time quotes for symbols like SPY, ^VIX"""
-    url = 'https://api.tradier.com/v1/markets/quotes'
+    """Fetch real-time quotes for several symbols (e.g. SPY, ^VIX) in one request"""
+    url = f'{TRADIER_BASE_URL}/markets/quotes'
     params = {'symbols': ','.join(symbols)}
     try:
-        response = requests.get(url, headers=tradier_headers, params=params, timeout=10)
+        response = http_client.get(url, headers=tradier_headers, params=params)
         if response.status_code == 200:
             return response.json().get('quotes', {})
     except Exception as e:
         print(f"Tradier quote request failed: {e}")
     return None
-    
-def get_tradier_history(symbol, interval='1min', start=None, end=None):
-    """Fetch intraday history for anchored VWAP calculation"""
-    url = 'https://api.tradier.com/v1/markets/history'
-    if not start:
-        today = datetime.now().date()
-        start = (today - timedelta(days=30)).strftime('%Y-%m-%d')  # Fetch last 30 days for EMA
-        end = datetime.now().strftime('%Y-%m-%d %H:%M')
+
+def fetch_tradier_history(symbol, interval, start, end):
+    """Fetch raw history bars from Tradier; None if the request failed"""
+    url = f'{TRADIER_BASE_URL}/markets/history'
     params = {'symbol': symbol, 'interval': interval, 'start': start, 'end': end}
-    response = requests.get(url, headers=tradier_headers, params=params)
-    data = response.json()['history']['day'] if response.ok else []
-    return pd.DataFrame(data)  # Columns: date, open, high, low, close, volume
-
-def compute_anchored_vwap(df, anchor_time='09:33'):
-    """Compute anchored VWAP from first 3-min (aggregate first 3 bars)"""
-    df['timestamp'] = pd.to_datetime(df['date'])
-    df = df.sort_values('timestamp')
-    # Aggregate first 3 min if needed (assuming 1min bars)
-    first_three = df.iloc[0:3]
-    anchor_close = first_three['close'].mean()  # Simple approx; adjust
-    anchor_idx = df[df['timestamp'] >= pd.to_datetime(anchor_time)].index[0]
-    df_post = df.iloc[anchor_idx:]
-    typical_price = (df_post['high'] + df_post['low'] + df_post['close']) / 3
-    pv = typical_price * df_post['volume']
-    df_post['vwap'] = pv.cumsum() / df_post['volume'].cumsum()
-    # Bands: ±3 SD
-    df_post['sd'] = (typical_price - df_post['vwap']).rolling(20).std()
-    df_post['upper3'] = df_post['vwap'] + 3 * df_post['sd']
-    df_post['lower3'] = df_post['vwap'] - 3 * df_post['sd']
-    df_post['upper2'] = df_post['vwap'] + 2 * df_post['sd']
-    df_post['lower2'] = df_post['vwap'] - 2 * df_post['sd']
-    # Slope over last 10 bars
-    recent_vwap = df_post['vwap'].tail(10)
-    slope = np.polyfit(range(len(recent_vwap)), recent_vwap, 1)[0]
-    return df_post.iloc[-1], slope  # Current row, slope
-
-def compute_indicators(df):
-    """Compute RSI, MACD, ATR, etc. using pandas-ta or manual"""
-    # Assuming pandas-ta installed; else implement
-    df['rsi'] = ta.momentum.RSIIndicator(df['close'], window=14).rsi()
-    macd = ta.trend.MACD(df['close'])
-    df['macd'] = macd.macd()
-    df['macd_signal'] = macd.macd_signal()
-    df['macd_hist'] = macd.macd_diff()
-    df['atr'] = ta.volatility.AverageTrueRange(df['high'], df['low'], df['close'], window=14).average_true_range()
-    df['ema_21'] = ta.core.ema(df['close'], length=21)
-    return df.iloc[-1]  # Current values
+    try:
+        response = http_client.get(url, headers=tradier_headers, params=params)
+        if not response.ok:
+            return None
+        history = response.json().get('history') or {}
+    except Exception as e:
+        print(f"Tradier history request failed: {e}")
+        return None
+    bars = history.get('day') or []
+    return [bars] if isinstance(bars, dict) else bars  # Single bar comes back as a dict
+
+# Last 30 days of bars per (symbol, interval), refreshed with only the new bars
+bar_cache = BarCache(fetch_tradier_history)
+
+# The last 30 days of 1-min bars per symbol, in fixed memory; each tick writes
+# only the bars that are new or were still forming at the previous one
+bar_rings = {symbol: BarRing() for symbol in SYMBOLS}
+
+def bar_arrays(bars, after=None):
+    """(timestamps, {column: array}) for Tradier bar dicts (sorted by date) from after (epoch) on"""
+    start = 0
+    if after is not None:
+        key = to_date(after)
+        start = len(bars)
+        while start and bars[start - 1]['date'] >= key:
+            start -= 1
+    bars = bars[start:]
+    return to_epoch([bar['date'] for bar in bars]), {
+        col: np.array([bar[col] for bar in bars], dtype=float) for col in ['open', 'high', 'low', 'close', 'volume']
+    }
+
+def update_bars(symbol, bars):
+    """Write the new and revised bars of a Tradier history list to the
+    symbol's ring and market data store; returns the ring"""
+    ring = bar_rings[symbol]
+    timestamps, values = bar_arrays(bars, ring.last_timestamp())
+    if len(timestamps):
+        ring.upsert(timestamps, values)
+        append_market_data(symbol, timestamps, values)
+    return ring
+
+def bars_since(bars, last_key):
+    """Ring views from an engine's last bar on (it may have been partial), with their date keys"""
+    rows = bars.since(int(to_epoch(last_key)) if last_key is not None else None)
+    return rows, to_dates(rows['timestamp'])
+
+# Anchored VWAP accumulators by (symbol, anchor); anchors: '09:33' (session), 'prior_close', ...
+SESSION_ANCHOR = '09:33'
+vwap_engines = {}
+
+def compute_anchored_vwap(bars, anchor_time=SESSION_ANCHOR, symbol=None):
+    """Anchored VWAP with ±2/±3 SD bands and slope, fed only bars newer than the last tick"""
+    engine = vwap_engines.get((symbol, anchor_time))
+    if engine is None:
+        engine = vwap_engines[(symbol, anchor_time)] = AnchoredVWAP(anchor_time)
+    rows, keys = bars_since(bars, engine.last_key)
+    vwaps = [engine.update(date, high, low, close, volume)[0]['vwap']
+             for date, high, low, close, volume in zip(keys, rows['high'], rows['low'], rows['close'], rows['volume'])]
+    if anchor_time == SESSION_ANCHOR:
+        bars.set_derived('vwap', vwaps)  # Session VWAP per bar, kept in the ring
+    return engine.values()  # Current row, slope
+
+# RSI/MACD/ATR/EMA state carried between ticks, by symbol
+indicator_engines = {}
+INDICATOR_COLUMNS = ('rsi', 'macd', 'macd_signal', 'atr', 'ema_21')  # Kept per bar in the ring
+
+def compute_indicators(bars, symbol=None):
+    """Update RSI, MACD, ATR and EMA(21) with bars newer than the last tick"""
+    indicator_engine = indicator_engines.get(symbol)
+    if indicator_engine is None:
+        indicator_engine = indicator_engines[symbol] = StreamingIndicators()
+    rows, keys = bars_since(bars, indicator_engine.last_key)
+    history = [indicator_engine.update(date, high, low, close)
+               for date, high, low, close in zip(keys, rows['high'], rows['low'], rows['close'])]
+    for name in INDICATOR_COLUMNS:
+        bars.set_derived(name, [values[name] for values in history])
+    return indicator_engine.values()  # Current values
+
+def calculate_trend_channels(frames, period=20):
+    """Linear regression trend channel status for several timeframes in one batched fit.
+
+    frames maps a name (e.g. a timeframe, or a (symbol, timeframe) pair) to its
+    bars, a BarRing or a DataFrame; returns {name: status}.
+    """
+    arrays = {name: (np.asarray(bars['high']), np.asarray(bars['low']), np.asarray(bars['close'])) for name, bars in frames.items() if len(bars)}
+    statuses = trend_channels(arrays, (period,))
+    return {name: statuses[name][period] if name in statuses else 'N/A' for name in frames}
+
+# 3/5/10/15/30min and 1h bars per symbol, built from the 1-min ring as bars
+# arrive instead of fetching each timeframe's history
+timeframe_aggregators = {}
+CHANNEL_TIMEFRAMES = (1, 30)  # Minutes; the prompt's 1min and 30min channels
+
+def update_timeframes(bars, symbol=None):
+    """Fold this tick's 1-min bars into the symbol's higher timeframes"""
+    aggregator = timeframe_aggregators.get(symbol)
+    if aggregator is None:
+        aggregator = timeframe_aggregators[symbol] = TimeframeAggregator()
+    return aggregator.update(bars)
 
 def calculate_trend_channel(df, period=20):
     """Calculate simple linear regression trend channel"""
-    df = df.tail(period)  # Last N bars
-    x = np.arange(len(df))
-    
-    # Upper channel: regression on highs
-    slope_high, intercept_high, _, _, _ = linregress(x, df['high'])
-    upper = slope_high * x + intercept_high
-    
-    # Lower channel: regression on lows
-    slope_low, intercept_low, _, _, _ = linregress(x, df['low'])
-    lower = slope_low * x + intercept_low
-    
-    # Main trend on closes for direction
-    slope_close, intercept_close, _, _, _ = linregress(x, df['close'])
-    
-    # Current price relation
-    current_price = df['close'].iloc[-1]
-    current_upper = upper[-1]
-    current_lower = lower[-1]
-    
-    if slope_close > 0:
-        channel_type = 'bullish'
-    elif slope_close < 0:
-        channel_type = 'bearish'
-    else:
-        channel_type = 'neutral'
-    
-    if current_price > current_upper:
-        status = f'exited above {channel_type} channel'
-    elif current_price < current_lower:
-        status = f'exited below {channel_type} channel'
-    else:
-        status = f'within {channel_type} channel'
-    
-    return status
+    return calculate_trend_channels({'tf': df}, period)['tf']
+
+# Scraped values change at most daily: seconds each may be served from cache
+SCRAPE_TTLS = {
+    'pe_ratio': 6 * 3600,
+    'dividend_yield': 6 * 3600,
+    'sector_weights': 24 * 3600,
+    'fed_rate': 12 * 3600,
+    'cpi': 24 * 3600,
+    'treasury_yield': 3600,
+}
+scrape_cache = ScrapeCache()
+
+def parse_html(text):
+    # bs4 is only loaded by the first scrape (in a background refresh), not at startup
+    from bs4 import BeautifulSoup
+    return BeautifulSoup(text, 'html.parser')
+
+def scrape_multpl(url):
+    r = http_client.get(url)
+    soup = parse_html(r.text)
+    return float(soup.find('div', id='current').text.strip().split()[0])
+
+def scrape_pe_ratio():
+    """P/E Ratio from multpl.com"""
+    return scrape_multpl('https://www.multpl.com/s-p-500-pe-ratio')
+
+def scrape_dividend_yield():
+    """Dividend Yield from multpl.com"""
+    return scrape_multpl('https://www.multpl.com/s-p-500-dividend-yield')
+
+def scrape_sector_weights():
+    """Sector Weights approximation (by count of companies, not market cap) from Wikipedia"""
+    import pandas as pd  # Only this scrape needs pandas (and lxml), so it stays out of startup
+    url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
+    df = pd.read_html(StringIO(http_client.get(url).text))[0]  # pandas imports lxml on first use
+    sector_counts = df['GICS Sector'].value_counts(normalize=True) * 100
+    return ', '.join([f"{sector}: {weight:.1f}%" for sector, weight in sector_counts.items()])
+
+def scrape_fed_rate():
+    """Fed Funds Rate from FRED"""
+    r = http_client.get('https://fred.stlouisfed.org/series/FEDFUNDS')
+    soup = parse_html(r.text)
+    return float(soup.find('span', {'class': 'series-meta-observation-value'}).text.strip())
+
+def scrape_cpi():
+    """CPI YoY from BLS"""
+    r = http_client.get('https://www.bls.gov/cpi/')
+    soup = parse_html(r.text)
+    match = re.search(r'rose (\d\.\d) percent over the last 12 months', soup.get_text())
+    if not match:
+        raise ValueError("No match")
+    return float(match.group(1))
+
+def scrape_treasury_yield():
+    """10Y Treasury Yield from Treasury.gov"""
+    current_month = datetime.now().strftime('%Y%m')
+    url = f'https://home.treasury.gov/resource-center/data-chart-center/interest-rates/TextView?type=daily_treasury_yield_curve&field_tdr_date_value_month={current_month}'
+    r = http_client.get(url)
+    soup = parse_html(r.text)
+    last_row = soup.find_all('tr')[-1]
+    tds = last_row.find_all('td')
+    return float(tds[12].text)
+
+def cached_scrape(name, fetch, fallback):
+    return scrape_cache.get(name, fetch, SCRAPE_TTLS[name], fallback)
 
 def get_fundamentals():
-    """Fetch S&P 500 fundamentals from free web sources"""
-    # P/E Ratio from multpl.com
-    try:
-        url = 'https://www.multpl.com/s-p-500-pe-ratio'
-        r = requests.get(url)
-        soup = BeautifulSoup(r.text, 'html.parser')
-        pe_ratio = float(soup.find('div', id='current').text.strip().split()[0])
-    except:
-        pe_ratio = 25.0  # Fallback
-
-    # Dividend Yield from multpl.com
-    try:
-        url = 'https://www.multpl.com/s-p-500-dividend-yield'
-        r = requests.get(url)
-        soup = BeautifulSoup(r.text, 'html.parser')
-        dividend_yield = float(soup.find('div', id='current').text.strip().split()[0])
-    except:
-        dividend_yield = 1.5  # Fallback
-
-    # Sector Weights approximation (by count of companies, not market cap) from Wikipedia
-    try:
-        url = 'https://en.wikipedia.org/wiki/List_of_S%26P_500_companies'
-        df = pd.read_html(url)[0]
-        sector_counts = df['GICS Sector'].value_counts(normalize=True) * 100
-        sector_weights = ', '.join([f"{sector}: {weight:.1f}%" for sector, weight in sector_counts.items()])
-    except:
-        sector_weights = "Technology: 30%, Financials: 15%"  # Fallback
-
+    """S&P 500 fundamentals from free web sources (cached, refreshed in the background)"""
+    pe_ratio = cached_scrape('pe_ratio', scrape_pe_ratio, 25.0)
+    dividend_yield = cached_scrape('dividend_yield', scrape_dividend_yield, 1.5)
+    sector_weights = cached_scrape('sector_weights', scrape_sector_weights, "Technology: 30%, Financials: 15%")
     return pe_ratio, dividend_yield, sector_weights
 
 def get_macro():
-    """Fetch macro data from free web sources"""
-    # Fed Funds Rate from FRED
-    try:
-        url = 'https://fred.stlouisfed.org/series/FEDFUNDS'
-        r = requests.get(url)
-        soup = BeautifulSoup(r.text, 'html.parser')
-        fed_rate = float(soup.find('span', {'class': 'series-meta-observation-value'}).text.strip())
-    except:
-        fed_rate = 5.25  # Fallback
-
-    # CPI YoY from BLS
-    try:
-        url = 'https://www.bls.gov/cpi/'
-        r = requests.get(url)
-        soup = BeautifulSoup(r.text, 'html.parser')
-        text = soup.get_text()
-        match = re.search(r'rose (\d\.\d) percent over the last 12 months', text)
-        if match:
-            cpi = float(match.group(1))
-        else:
-            raise ValueError("No match")
-    except:
-        cpi = 3.2  # Fallback
-
-    # 10Y Treasury Yield from Treasury.gov
-    try:
-        current_month = datetime.now().strftime('%Y%m')
-        url = f'https://home.treasury.gov/resource-center/data-chart-center/interest-rates/TextView?type=daily_treasury_yield_curve&field_tdr_date_value_month={current_month}'
-        r = requests.get(url)
-        soup = BeautifulSoup(r.text, 'html.parser')
-        last_row = soup.find_all('tr')[-1]
-        tds = last_row.find_all('td')
-        treasury_yield = float(tds[12].text)
-    except:
-        treasury_yield = 4.2  # Fallback
-
+    """Macro data from free web sources (cached, refreshed in the background)"""
+    fed_rate = cached_scrape('fed_rate', scrape_fed_rate, 5.25)
+    cpi = cached_scrape('cpi', scrape_cpi, 3.2)
+    treasury_yield = cached_scrape('treasury_yield', scrape_treasury_yield, 4.2)
     return fed_rate, cpi, treasury_yield
 
-def get_sentiment():
-    today_date = datetime.now().strftime('%Y-%m-%d')
-    lux_trendcatcher_file = f'lux_trendcatcher_{today_date}.json'
-    lux_exits_file = f'lux_exits_{today_date}.json'
-    
-    # Ensure files exist as empty lists if not present
-    if not os.path.exists(lux_trendcatcher_file):
-        with open(lux_trendcatcher_file, 'w') as f:
-            json.dump([], f)
-    
-    if not os.path.exists(lux_exits_file):
-        with open(lux_exits_file, 'w') as f:
-            json.dump([], f)
-    
+def report_fallbacks():
+    """Print sources currently serving fallback values instead of live data"""
+    fallbacks = [name for name, info in scrape_cache.status().items() if info['fallback']]
+    if fallbacks:
+        print(f"Using fallback values for: {', '.join(fallbacks)}")
+
+def get_sentiment(alert_index, keep=ALERTS_PER_TF):
     try:
-        # Load trend catcher data (assuming it's a list of alerts with 'tf' and 'alert' or similar)
-        with open(lux_trendcatcher_file, 'r') as f:
-            trend_data = json.load(f)
-        
-        # Extract latest trend catcher for each timeframe
+        # Latest trend catcher alert for each timeframe (highest bartime)
         time_frames = ['1min', '3min', '5min', '10min', '30min', '1h']
         trend_catcher = {}
         for tf in time_frames:
-            # Find latest alert for this tf (assuming alerts have 'tf' and 'alert' fields, and 'bartime' for sorting)
-            tf_alerts = [a for a in trend_data if a.get('tf') == tf]
-            if tf_alerts:
-                latest = max(tf_alerts, key=lambda a: a.get('bartime', 0))
-                trend_catcher[tf] = latest.get('alert', 'N/A')
-            else:
-                trend_catcher[tf] = 'N/A'
+            latest = alert_index.latest_alert(lux_trendcatcher_prefix, tf)
+            trend_catcher[tf] = latest.get('alert', 'N/A') if latest else 'N/A'
         trend_catcher_str = ', '.join([f"{tf}: {trend_catcher[tf]}" for tf in time_frames])
-        
-        # Load exits data
-        with open(lux_exits_file, 'r') as f:
-            exits_data = json.load(f)
-        
-        # Extract exits per timeframe (allow multiple)
+
+        # Exits per timeframe (allow multiple): newest `keep` in full, older ones counted
         exit_frames = ['3min', '5min', '15min', '30min']
         exits = {}
         for tf in exit_frames:
-            tf_exits = [a.get('alert', 'N/A') for a in exits_data if a.get('tf') == tf]
+            tf_exits = compact_alerts(alert_index.tf_history(lux_exits_prefix, tf), alert_index.tf_count(lux_exits_prefix, tf),
+                                      keep, lambda a: a.get('alert', 'N/A'), 'exits')
             exits[tf] = ', '.join(tf_exits) if tf_exits else 'N/A'
         exits_str = ', '.join([f"{tf}: {exits[tf]}" for tf in exit_frames])
-        
+
         return f"LuxAlgo Trend Catcher: {trend_catcher_str}; Exits: {exits_str}"
     except Exception as e:
         return "No LuxAlgo data available"
 
-def get_oscillator_alerts():
-    """Load daily LuxAlgo oscillator matrix alerts and format with timestamps"""
+def format_alert(alert):
+    ts = datetime.fromtimestamp(alert['bartime'] / 1000).strftime('%Y-%m-%d %H:%M:%S') if 'bartime' in alert else 'N/A'
+    return f"Alert: {alert.get('alert', 'N/A')}, TF: {alert.get('tf', 'N/A')}, OHLCV: O={alert['ohlcv'].get('open', 'N/A')}, H={alert['ohlcv'].get('high', 'N/A')}, L={alert['ohlcv'].get('low', 'N/A')}, C={alert['ohlcv'].get('close', 'N/A')}, V={alert['ohlcv'].get('volume', 'N/A')}, Time: {ts}"
+
+def format_alerts(alert_index, prefix, keep):
+    """Newest `keep` alerts per timeframe with timestamps; older ones as a count per timeframe"""
+    formatted = []
+    for tf in alert_index.timeframes(prefix):
+        formatted.extend(compact_alerts(alert_index.tf_history(prefix, tf), alert_index.tf_count(prefix, tf),
+                                        keep, format_alert, f"TF {tf}"))
+    return '; '.join(formatted)
+
+def get_oscillator_alerts(alert_index, keep=ALERTS_PER_TF):
+    """Daily LuxAlgo oscillator matrix alerts formatted with timestamps"""
     try:
-        with open(lux_oscillator_file, 'r') as f:
-            alerts = json.load(f)
-        formatted = []
-        for alert in alerts:
-            ts = datetime.fromtimestamp(alert['bartime'] / 1000).strftime('%Y-%m-%d %H:%M:%S') if 'bartime' in alert else 'N/A'
-            formatted.append(f"Alert: {alert.get('alert', 'N/A')}, TF: {alert.get('tf', 'N/A')}, OHLCV: O={alert['ohlcv'].get('open', 'N/A')}, H={alert['ohlcv'].get('high', 'N/A')}, L={alert['ohlcv'].get('low', 'N/A')}, C={alert['ohlcv'].get('close', 'N/A')}, V={alert['ohlcv'].get('volume', 'N/A')}, Time: {ts}")
-        return '; '.join(formatted) if formatted else "No oscillator alerts today"
-    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        return format_alerts(alert_index, lux_oscillator_prefix, keep) or "No oscillator alerts today"
+    except (KeyError, AttributeError, TypeError):
         return "No oscillator alerts today"
 
-def get_price_action_alerts():
-    """Load daily LuxAlgo price action concepts alerts and format with timestamps"""
+def get_price_action_alerts(alert_index, keep=ALERTS_PER_TF):
+    """Daily LuxAlgo price action concepts alerts formatted with timestamps"""
     try:
-        with open(lux_price_action_file, 'r') as f:
-            alerts = json.load(f)
-        formatted = []
-        for alert in alerts:
-            ts = datetime.fromtimestamp(alert['bartime'] / 1000).strftime('%Y-%m-%d %H:%M:%S') if 'bartime' in alert else 'N/A'
-            formatted.append(f"Alert: {alert.get('alert', 'N/A')}, TF: {alert.get('tf', 'N/A')}, OHLCV: O={alert['ohlcv'].get('open', 'N/A')}, H={alert['ohlcv'].get('high', 'N/A')}, L={alert['ohlcv'].get('low', 'N/A')}, C={alert['ohlcv'].get('close', 'N/A')}, V={alert['ohlcv'].get('volume', 'N/A')}, Time: {ts}")
-        return '; '.join(formatted) if formatted else "No price action alerts today"
-    except (FileNotFoundError, json.decoder.JSONDecodeError):
+        return format_alerts(alert_index, lux_price_action_prefix, keep) or "No price action alerts today"
+    except (KeyError, AttributeError, TypeError):
         return "No price action alerts today"
 
-def get_historical_context(df):
-    """Simple historical avg"""
-    prev_day_high = df['high'].max()  # Approx
-    prev_day_low = df['low'].min()
+def get_historical_context(bars):
+    """Simple historical avg (range of the bars before the newest)"""
+    if len(bars) < 2:
+        return np.nan, np.nan
+    prev_day_high = bars['high'][:-1].max()  # Approx
+    prev_day_low = bars['low'][:-1].min()
     return prev_day_high, prev_day_low
 
-def get_candle_patterns(df):
-    """Detect patterns like engulfing"""
-    last_candle = df.iloc[-1]
-    prev_candle = df.iloc[-2]
-    if last_candle['close'] > prev_candle['open'] and last_candle['open'] < prev_candle['close']:  # Bullish engulfing approx
-        pattern = "bullish engulfing"
-    elif last_candle['close'] < prev_candle['open'] and last_candle['open'] > prev_candle['close']:  # Bearish engulfing approx
-        pattern = "bearish engulfing"
-    else:
-        pattern = "none"
-    return pattern
-
-def build_prompt(current_data, slope, indicators, vix, fundamentals, macro, sentiment, oscillator_alerts, price_action_alerts, historical, candle, time_of_day, channel_1min, channel_30min):
+# Timeframes (minutes) whose newest closed bar is scanned for candle patterns
+CANDLE_TIMEFRAMES = (1, 5, 15, 30)
+CANDLE_MIN_STRENGTH = 0.25  # Weaker hits (e.g. an engulfing body barely larger) are left out
+
+def get_candle_patterns(timeframes):
+    """[(minutes, pattern, strength)] on the newest 1-min bar and the newest
+    closed bar of each higher timeframe, scanned in one pass"""
+    frames = {tf: (timeframes[tf]['open'], timeframes[tf]['high'], timeframes[tf]['low'], timeframes[tf]['close'])
+              for tf in CANDLE_TIMEFRAMES}
+    found = scan_frames(frames, bars=2)
+    candles = []
+    for tf in CANDLE_TIMEFRAMES:
+        newest = len(timeframes[tf]) - (2 if timeframes.partial(tf) else 1)
+        candles.extend((tf, pattern, strength) for index, pattern, strength in found[tf]
+                       if index == newest and strength >= CANDLE_MIN_STRENGTH)
+    return candles
+
+def format_candles(candles):
+    """Prompt text, e.g. '1min: hammer (bullish) 0.71 | 15min: inside bar 0.40'"""
+    by_tf = {}
+    for tf, pattern, strength in candles:
+        by_tf.setdefault(tf, []).append(f"{describe(pattern)} {strength:.2f}")
+    return ' | '.join(f"{tf}min: {', '.join(hits)}" for tf, hits in by_tf.items()) or "none"
+
+def build_prompt(current_data, slope, indicators, vix, fundamentals, macro, sentiment, oscillator_alerts, price_action_alerts, historical, candle, time_of_day, channel_1min, channel_30min, symbol, position):
     pe, div_yield, sectors = fundamentals
     fed, cpi, treasury = macro
     prev_high, prev_low = historical
@@ -336,16 +447,16 @@ def build_prompt(current_data, slope, indicators, vix, fundamentals, macro, sent
         interaction = "interacting with upper outer band"
     # Add existing position info
     position_info = "No open position."
-    if current_position:
-        position_info = f"You entered a {current_position['type']} position at {current_position['entry_time']} and now your focus is closing the trade for profit. Current open position: {current_position['type']} with {current_position['contracts']} contracts entered at {current_position['entry_price']}."
+    if position:
+        position_info = f"You entered a {position['type']} position at {position['entry_time']} and now your focus is closing the trade for profit. Current open position: {position['type']} with {position['contracts']} contracts entered at {position['entry_price']}."
     # Add EMA info
     ema_21 = indicators['ema_21']
     ema_relation = "above" if current_price > ema_21 else "below" if current_price < ema_21 else "at"
     # Introduction
-    intro = "You are a professional day trader with years of experience in SPY options, focused on generating consistent profits to support a charitable organization dedicated to education for underprivileged children. Your decisions prioritize high-confidence setups, risk management, and ethical trading to maximize returns for good."
+    intro = f"You are a professional day trader with years of experience in {symbol} options, focused on generating consistent profits to support a charitable organization dedicated to education for underprivileged children. Your decisions prioritize high-confidence setups, risk management, and ethical trading to maximize returns for good."
     prompt = f"""
 {intro}
-Analyze SPY for trading signal:
+Analyze {symbol} for trading signal:
 Current price: {current_price} ({interaction})
 Anchored VWAP (from 09:33): {current_data['vwap']}
 Outermost bands: Upper {upper_band}, Lower {lower_band}
@@ -361,7 +472,7 @@ LuxAlgo Alerts: {sentiment}
 LuxAlgo Oscillator Matrix Alerts (with timestamps): {oscillator_alerts}
 LuxAlgo Price Action Concepts Alerts (with timestamps): {price_action_alerts}
 Prev day high/low: {prev_high}/{prev_low}
-Candle pattern: {candle}
+Candle patterns (strength 0-1): {candle}
 Time: {time_of_day}
 {position_info}
 Price relative to 21-day EMA: {ema_relation} (EMA value: {ema_21})
@@ -376,6 +487,20 @@ Return only: 'long', 'short', 'close long', or 'close short'. High confidence on
 """
     return prompt
 
+def build_bounded_prompt(symbol, current_data, slope, indicators, vix, fundamentals, macro, historical, candle, time_of_day, channel_1min, channel_30min):
+    """build_prompt for symbol with the LuxAlgo alert sections compacted to fit the prompt budget"""
+    alert_index = alert_indexes[symbol]
+    def render(keep):
+        return build_prompt(
+            current_data, slope, indicators, vix, fundamentals, macro,
+            get_sentiment(alert_index, keep), get_oscillator_alerts(alert_index, keep), get_price_action_alerts(alert_index, keep),
+            historical, candle, time_of_day, channel_1min, channel_30min, symbol, positions.get(symbol)
+        )
+    prompt, stats = fit_prompt(render, PROMPT_MAX_CHARS, PROMPT_MAX_TOKENS, ALERTS_PER_TF)
+    print(f"Prompt: {stats['chars']} chars, ~{stats['tokens']} tokens, {stats['alerts_per_tf']} alerts/tf, "
+          f"built in {stats['build_ms']:.1f} ms{' (over budget)' if stats['over_budget'] else ''}")
+    return prompt
+
 def send_to_xai(prompt):
     url = 'https://api.x.ai/v1/chat/completions'  # Assumed endpoint
     headers = {'Authorization': f'Bearer {XAI_API_KEY}', 'Content-Type': 'application/json'}
@@ -383,176 +508,353 @@ def send_to_xai(prompt):
         'model': 'grok-4',
         'messages': [{'role': 'user', 'content': prompt}]
     }
-    response = requests.post(url, headers=headers, json=data)
+    try:
+        response = http_client.post(url, headers=headers, json=data)
+    except Exception as e:
+        print(f"xAI request failed: {e}")
+        return None
     if response.ok:
         return response.json()['choices'][0]['message']['content'].strip()
     return None
 
 def send_to_discord(message):
     data = {'content': message}
-    requests.post(DISCORD_WEBHOOK, json=data)
+    try:
+        response = http_client.post(DISCORD_WEBHOOK, json=data)
+    except Exception as e:
+        print(f"Discord post failed: {e}")
+        return False
+    return response.ok
 
-def send_to_traderspost(action, quantity=None):
+def send_to_traderspost(ticker, action, quantity=None):
     if action == "exit":
         payload = {
-            "ticker": "SPY",
+            "ticker": ticker,
             "action": "exit"
         }
     else:
         payload = {
-            "ticker": "SPY",
+            "ticker": ticker,
             "action": action,
-            "quantity": quantity if quantity else 10
+            "quantity": quantity if quantity else CONTRACTS
         }
-    response = requests.post(TRADERSPOST_WEBHOOK, json=payload)
+    try:
+        response = http_client.post(TRADERSPOST_WEBHOOK, json=payload)
+    except Exception as e:
+        print(f"Failed to send to TradersPost: {e}")
+        return
     if response.ok:
-        print("Sent to TradersPost successfully")
+        print(f"Sent {ticker} {action} to TradersPost successfully")
     else:
         print(f"Failed to send to TradersPost: {response.text}")
 
-def handle_signal(signal, spy_price, time_of_day):
-    global current_position
+# Orders go out on a dedicated worker; Discord notifications are batched and
+# rate-limited in the background so they never hold up an order. Its worker
+# threads are started by run(), not on import
+dispatcher = None
+
+def start_dispatcher():
+    global dispatcher
+    if dispatcher is None:
+        dispatcher = OutboundDispatcher(send_to_traderspost, send_to_discord)
+        atexit.register(dispatcher.stop)
+    return dispatcher
+
+def notify(message, key=None):
+    dispatcher.notify(message, key)
+
+# Reuses the last xAI answer while the quantized prompt inputs stay the same
+# (sensitivity steps and max age live in decision_cache.py)
+decision_cache = DecisionCache()
+
+# xAI calls for several symbols run concurrently: a tick waits for the
+# slowest answer, not the sum of them
+xai_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='xai')
+
+def ask_xai(prompts):
+    """{symbol: answer} for {symbol: prompt}"""
+    futures = {symbol: xai_pool.submit(send_to_xai, prompt) for symbol, prompt in prompts.items()}
+    return {symbol: future.result() for symbol, future in futures.items()}
+
+def handle_signal(symbol, signal, price, time_of_day):
+    position = positions.get(symbol)
     if signal == 'long':
-        if current_position is None:
-            current_position = {'type': 'long', 'entry_price': spy_price, 'contracts': 10, 'entry_time': time_of_day}
-            save_position(current_position)
-            send_to_discord(f"Entered LONG at {spy_price} - Time: {time_of_day}")
-            send_to_traderspost("buy")
+        if position is None:
+            positions[symbol] = {'type': 'long', 'entry_price': price, 'contracts': CONTRACTS, 'entry_time': time_of_day}
+            save_positions()
+            dispatcher.order(symbol, "buy")
+            notify(f"Entered LONG {symbol} at {price} - Time: {time_of_day}")
     elif signal == 'short':
-        if current_position is None:
-            current_position = {'type': 'short', 'entry_price': spy_price, 'contracts': 10, 'entry_time': time_of_day}
-            save_position(current_position)
-            send_to_discord(f"Entered SHORT at {spy_price} - Time: {time_of_day}")
-            send_to_traderspost("buy")
-    elif signal == 'close long' and current_position and current_position['type'] == 'long':
-        send_to_discord(f"Closed LONG at {spy_price} - Time: {time_of_day}")
-        send_to_traderspost("exit")
-        current_position = None
-        save_position(current_position)
-    elif signal == 'close short' and current_position and current_position['type'] == 'short':
-        send_to_discord(f"Closed SHORT at {spy_price} - Time: {time_of_day}")
-        send_to_traderspost("exit")
-        current_position = None
-        save_position(current_position)
-
-def monitor_position(spy_price, time_of_day):
-    global current_position
-    if current_position:
-        entry_price = current_position['entry_price']
-        pos_type = current_position['type']
-        price_change = spy_price - entry_price if pos_type == 'long' else entry_price - spy_price
+        if position is None:
+            positions[symbol] = {'type': 'short', 'entry_price': price, 'contracts': CONTRACTS, 'entry_time': time_of_day}
+            save_positions()
+            dispatcher.order(symbol, "buy")
+            notify(f"Entered SHORT {symbol} at {price} - Time: {time_of_day}")
+    elif signal == 'close long' and position and position['type'] == 'long':
+        dispatcher.order(symbol, "exit")
+        notify(f"Closed LONG {symbol} at {price} - Time: {time_of_day}")
+        del positions[symbol]
+        save_positions()
+    elif signal == 'close short' and position and position['type'] == 'short':
+        dispatcher.order(symbol, "exit")
+        notify(f"Closed SHORT {symbol} at {price} - Time: {time_of_day}")
+        del positions[symbol]
+        save_positions()
+
+def monitor_position(symbol, price, time_of_day):
+    position = positions.get(symbol)
+    if position:
+        entry_price = position['entry_price']
+        pos_type = position['type']
+        price_change = price - entry_price if pos_type == 'long' else entry_price - price
         if abs(price_change) >= 2:
             # Sell half contracts
-            half = current_position['contracts'] // 2
-            current_position['contracts'] = half
-            save_position(current_position)
-            send_to_discord(f"Sold half contracts ({current_position['contracts']} remaining) for {pos_type.upper()} due to $2 price change. Current SPY: {spy_price} - Time: {time_of_day}")
-            send_to_traderspost("sell", half)
-
-def monitor_stop_loss(spy_price, time_of_day, atr):
-    global current_position
-    if current_position:
-        entry_price = current_position['entry_price']
-        pos_type = current_position['type']
+            half = position['contracts'] // 2
+            position['contracts'] = half
+            save_positions()
+            dispatcher.order(symbol, "sell", half)
+            notify(f"Sold half contracts ({position['contracts']} remaining) for {pos_type.upper()} {symbol} due to $2 price change. Current {symbol}: {price} - Time: {time_of_day}")
+
+def monitor_stop_loss(symbol, price, time_of_day, atr):
+    position = positions.get(symbol)
+    if position:
+        entry_price = position['entry_price']
+        pos_type = position['type']
         stop_loss = entry_price - (atr * 2) if pos_type == 'long' else entry_price + (atr * 2)  # Example: 2x ATR stop
-        if (pos_type == 'long' and spy_price <= stop_loss) or (pos_type == 'short' and spy_price >= stop_loss):
-            send_to_discord(f"Stop loss hit for {pos_type.upper()} at {spy_price} - Time: {time_of_day}")
-            send_to_traderspost("exit")
-            current_position = None
-            save_position(current_position)
-
-# Main loop (run every 1 min during market hours)
-while True:
-    now = datetime.now()
-    
-    # Market hours: 9:30 AM – 4:00 PM ET (UTC-5 / UTC-4 during DST)
-    if 9 <= now.hour < 16:
-        # Fetch real-time quotes
-        quotes = get_tradier_quotes(['SPY', '^VIX'])
-        if not quotes or 'quote' not in quotes:
-            print("No valid quote data from Tradier")
-            time.sleep(60)
-            continue
-
-        q = quotes['quote']
-        # Handle single dict or list of dicts
-        if isinstance(q, dict):
-            quote_items = [q]
-        else:
-            quote_items = q
-
-        spy_price = None
-        vix = 0.0
-
-        for item in quote_items:
-            if not isinstance(item, dict):
-                continue
-            symbol = item.get('symbol')
-            last = item.get('last')
-            if symbol == 'SPY' and last is not None:
-                spy_price = float(last)
-            elif symbol == '^VIX' and last is not None:
-                vix = float(last)
-
-        if spy_price is None:
-            print("SPY price not available")
-            time.sleep(60)
-            continue
-
-        print(f"SPY: ${spy_price:.2f} | VIX: {vix:.2f}")
-
-        # Fetch 1-minute bars for VWAP and indicators
-        df_1min = get_tradier_history('SPY', interval='1min')
-        if df_1min.empty:
-            print("No 1min data")
-            time.sleep(60)
-            continue
-
-        # Append to daily market data file
-        append_market_data(df_1min)
-
+        if (pos_type == 'long' and price <= stop_loss) or (pos_type == 'short' and price >= stop_loss):
+            dispatcher.order(symbol, "exit")
+            notify(f"Stop loss hit for {pos_type.upper()} {symbol} at {price} - Time: {time_of_day}")
+            del positions[symbol]
+            save_positions()
+
+# Per-stage latency; summarized to METRICS_FILE every tick and served by
+# webhook.py's /metrics route
+METRICS_FILE = 'metrics_bot.json'
+timings = Timings()
+
+def write_metrics():
+    gauges = {f'decision_cache_{k}': v for k, v in decision_cache.stats().items()}
+    gauges.update({f'dispatch_{k}': v for k, v in dispatcher.stats().items()})
+    for host, stats in http_client.latency_stats().items():
+        for k in ('count', 'errors', 'p50_ms', 'p95_ms'):
+            gauges[f'http_{k}{{host="{host}"}}'] = stats[k]
+    gauges['scrape_fallbacks'] = sum(1 for info in scrape_cache.status().values() if info['fallback'])
+    try:
+        write_summary(METRICS_FILE, timings.summary(), gauges=gauges)
+    except OSError as e:
+        print(f"Failed to write metrics: {e}")
+
+# Network inputs for a tick are fetched in parallel; whatever misses the
+# deadline is replaced with its last-known value
+TICK_DEADLINE = 15  # seconds
+gatherer = InputGatherer(max_workers=len(SYMBOLS) + 3)
+
+def gather_inputs():
+    """Fetch quotes, bars per symbol, fundamentals and macro concurrently. Returns (values, stale names)."""
+    tasks = {
+        'quotes': timings.timed('fetch_quotes', lambda: get_tradier_quotes(SYMBOLS + [VIX_SYMBOL])),
+        'fundamentals': timings.timed('fetch_fundamentals', get_fundamentals),
+        'macro': timings.timed('fetch_macro', get_macro),
+    }
+    for symbol in SYMBOLS:
+        # 1-min bars stay a list of dicts here; the main thread writes the new ones to the ring
+        # and derives the higher timeframes from them
+        tasks[f'bars_1min:{symbol}'] = timings.timed('fetch_bars_1min', lambda symbol=symbol: bar_cache.get(symbol, '1min'))
+    values, stale = gatherer.gather(tasks, TICK_DEADLINE)
+    if stale:
+        print(f"Stale inputs after {gatherer.last_elapsed:.1f}s (using last known): {', '.join(stale)}")
+    return values, stale
+
+def process_tick(now, prices, vix, bars_1min, fundamentals, macro, ai_window, force_close, live_prices=True):
+    """One tick of the decision pipeline once its inputs are in, for every symbol
+    in prices: timeframes, indicators, channels, alerts, the xAI decisions in
+    the AI window, and position management. bars_1min maps each symbol to its
+    1-min BarRing. With live_prices False (prices are last-known quotes), the
+    bars, indicators and alerts are still brought up to date but no decision,
+    stop-loss or order is made."""
+    symbols = list(prices)
+    time_of_day = now.strftime('%H:%M ET')
+    with timings.time('timeframes'):
+        timeframes = {symbol: update_timeframes(bars_1min[symbol], symbol) for symbol in symbols}
+    # All symbols and timeframes go through one stacked channel fit
+    with timings.time('channels'):
+        channels = calculate_trend_channels({
+            (symbol, tf): timeframes[symbol][tf] for symbol in symbols for tf in CHANNEL_TIMEFRAMES
+        })
+    with timings.time('alerts'):
+        for symbol in symbols:
+            alert_indexes[symbol].refresh()
+
+    features = {}
+    for symbol in symbols:
+        bars = bars_1min[symbol]
         # Compute indicators and VWAP
-        current_data, slope = compute_anchored_vwap(df_1min)
-        indicators = compute_indicators(df_1min)
-        channel_1min = calculate_trend_channel(df_1min)
-        channel_30min = calculate_trend_channel(get_tradier_history('SPY', interval='30min'))
-        fundamentals = get_fundamentals()
-        macro = get_macro()
-        sentiment = get_sentiment()
-        oscillator_alerts = get_oscillator_alerts()
-        price_action_alerts = get_price_action_alerts()
-        historical = get_historical_context(df_1min.shift(periods=1))
-        candle = get_candle_patterns(df_1min)
-        time_of_day = now.strftime('%H:%M ET')
-
-        # Stop-loss check (every tick)
-        monitor_stop_loss(spy_price, time_of_day, indicators['atr'])
-
-        # AI query window: 9:45 AM – 12:00 PM ET
-        if (now.hour == 9 and now.minute >= 45) or (10 <= now.hour < 12) or (now.hour == 12 and now.minute == 0):
-            prompt = build_prompt(
-                current_data, slope, indicators, vix, fundamentals, macro,
-                sentiment, oscillator_alerts, price_action_alerts,
-                historical, candle, time_of_day, channel_1min, channel_30min
-            )
-            send_to_discord(f"Prompt sent to xAI:\n```\n{prompt}\n```")
-
-            signal = send_to_xai(prompt)
+        with timings.time('vwap'):
+            current_data, slope = compute_anchored_vwap(bars, symbol=symbol)
+        with timings.time('indicators'):
+            indicators = compute_indicators(bars, symbol=symbol)
+        historical = get_historical_context(bars)
+        with timings.time('candles'):
+            candles = get_candle_patterns(timeframes[symbol])
+        features[symbol] = (current_data, slope, indicators, historical, candles)
+
+        # Stop-loss check (every tick with live prices)
+        if live_prices:
+            monitor_stop_loss(symbol, prices[symbol], time_of_day, indicators['atr'])
+
+    if not live_prices:
+        return
+
+    # AI query window: 9:45 AM – 12:00 PM ET
+    if ai_window:
+        keys, prompts, signals, cached = {}, {}, {}, set()
+        for symbol in symbols:
+            current_data, slope, indicators, historical, candles = features[symbol]
+            channel_1min, channel_30min = channels[(symbol, 1)], channels[(symbol, 30)]
+            alert_index = alert_indexes[symbol]
+            keys[symbol] = (symbol, decision_key(
+                current_data, slope, indicators, (channel_1min, channel_30min),
+                [alert_index.counts[prefix] for prefix in alert_index.prefixes],
+                positions.get(symbol), tuple((tf, pattern) for tf, pattern, _ in candles)  # Strengths aren't part of the key
+            ))
+            hit, signal = decision_cache.lookup(keys[symbol])
+            if hit:
+                print(f"{symbol} prompt inputs unchanged, reusing xAI answer: {signal} ({decision_cache.stats()})")
+                signals[symbol] = signal
+                cached.add(symbol)
+                continue
+            with timings.time('prompt'):
+                prompts[symbol] = build_bounded_prompt(
+                    symbol, current_data, slope, indicators, vix, fundamentals, macro,
+                    historical, format_candles(candles), time_of_day, channel_1min, channel_30min
+                )
+            notify(f"Prompt sent to xAI for {symbol}:\n```\n{prompts[symbol]}\n```", key=f'prompt:{symbol}')
+
+        if prompts:
+            with timings.time('xai'):
+                answers = ask_xai(prompts)
+            for symbol, signal in answers.items():
+                if signal is not None:
+                    decision_cache.store(keys[symbol], signal)
+                signals[symbol] = signal
+        for symbol in symbols:
+            signal = signals.get(symbol)
             if signal in ['long', 'short', 'close long', 'close short']:
-                send_to_discord(f"AI SIGNAL: {signal.upper()} @ {time_of_day} | SPY: ${spy_price:.2f}")
-                handle_signal(signal, spy_price, time_of_day)
+                notify(f"AI SIGNAL {symbol}: {signal.upper()}{' (cached)' if symbol in cached else ''} @ {time_of_day} | {symbol}: ${prices[symbol]:.2f}")
+                handle_signal(symbol, signal, prices[symbol], time_of_day)
 
-            # Force close at noon ET
-            if now.hour == 12 and now.minute == 0 and current_position:
-                close_sig = 'close long' if current_position['type'] == 'long' else 'close short'
-                handle_signal(close_sig, spy_price, time_of_day)
+    for symbol in symbols:
+        # Force close at noon ET
+        position = positions.get(symbol)
+        if force_close and position:
+            close_sig = 'close long' if position['type'] == 'long' else 'close short'
+            handle_signal(symbol, close_sig, prices[symbol], time_of_day)
 
         # Partial profit taking on $2 move
-        monitor_position(spy_price, time_of_day)
+        monitor_position(symbol, prices[symbol], time_of_day)
+
+def run():
+    """Main loop: one tick per 1-min bar close during market hours, plus off-cycle ticks on pushed alerts"""
+    open_market_stores()
+    start_dispatcher()
+    scheduler = TickScheduler(SESSION_WINDOWS, SESSION_EVENTS)
+    listen_for_alerts(scheduler)
+    force_close_due = False
+    while True:
+        tick = scheduler.wait()
+        if tick.kind == 'bar':
+            timings.record('tick_jitter', tick.jitter)
+        else:
+            print(f"Off-cycle tick, pushed alerts: {', '.join(tick.reasons)}")
+        if 'force_close' in tick.events:
+            force_close_due = True
+        now = datetime.now()
+
+        # Market hours: 9:30 AM – 4:00 PM ET (UTC-5 / UTC-4 during DST)
+        if scheduler.active('market', now):
+            tick_start = time.perf_counter()
+            with timings.time('gather'):
+                inputs, stale = gather_inputs()
+
+            # Real-time quotes
+            quotes = inputs['quotes']
+            if not quotes or 'quote' not in quotes:
+                print("No valid quote data from Tradier")
+                continue
 
-    elif now.hour >= 16:
-        # After market close: clean up daily data
-        erase_market_data()
-        print("Market closed — daily data erased.")
+            q = quotes['quote']
+            # Handle single dict or list of dicts
+            if isinstance(q, dict):
+                quote_items = [q]
+            else:
+                quote_items = q
+
+            prices = {}
+            vix = 0.0
+
+            for item in quote_items:
+                if not isinstance(item, dict):
+                    continue
+                symbol = item.get('symbol')
+                last = item.get('last')
+                if symbol == VIX_SYMBOL and last is not None:
+                    vix = float(last)
+                elif symbol in SYMBOLS and last is not None:
+                    prices[symbol] = float(last)
+
+            missing = [symbol for symbol in SYMBOLS if symbol not in prices]
+            if missing:
+                print(f"Price not available: {', '.join(missing)}")
+
+            # 1-minute bars for VWAP and indicators; new ones go to the ring and the daily market data files
+            bars_1min = {}
+            with timings.time('store_bars'):
+                for symbol in list(prices):
+                    bars = inputs[f'bars_1min:{symbol}']
+                    if not bars:
+                        print(f"No 1min data for {symbol}")
+                        del prices[symbol]
+                        continue
+                    bars_1min[symbol] = update_bars(symbol, bars)
+            if not prices:
+                continue
 
-    time.sleep(60)  # Poll every minute
+            print(' | '.join(f"{symbol}: ${price:.2f}" for symbol, price in prices.items()) + f" | VIX: {vix:.2f}")
+
+            fundamentals = inputs['fundamentals'] or (25.0, 1.5, "Technology: 30%, Financials: 15%")
+            macro = inputs['macro'] or (5.25, 3.2, 4.2)
+            report_fallbacks()
+            # Bars and scrapes may fall back to their last-known values, quotes may not:
+            # an old price must not trigger a stop-loss or an order
+            live_prices = 'quotes' not in stale
+            if not live_prices:
+                print("Quotes missed the deadline: no decisions, stop-loss checks or orders this tick")
+            process_tick(now, prices, vix, bars_1min, fundamentals, macro,
+                         scheduler.active('ai', now), force_close_due, live_prices)
+            if live_prices:
+                force_close_due = False  # Only cleared once a tick had prices to close at
+
+            timings.record('tick', time.perf_counter() - tick_start)
+            write_metrics()
+
+        if 'market_close' in tick.events:
+            # After market close: clean up daily data
+            erase_market_data()
+            print("Market closed — daily data erased.")
+
+
+# Seconds from the start of the import to the scheduler running; a systemd
+# restart mid-session should be ticking again well within one bar
+STARTUP_BUDGET = 2.0
+
+def main():
+    """Entry point for python bot.py / python -m bot"""
+    startup = time.perf_counter() - IMPORT_START
+    timings.record('startup', startup)
+    over = f" — over the {STARTUP_BUDGET:.1f}s budget" if startup > STARTUP_BUDGET else ""
+    print(f"Started in {startup:.2f}s{over}, trading {', '.join(SYMBOLS)}")
+    run()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,121 @@
+"""Vectorized candlestick pattern scanner.
+
+Every pattern is an array expression over the bar axis, so a whole history,
+or just the newest bars of several timeframes stacked into one 2-D array, is
+scanned in a single pass. Each hit carries a strength in (0, 1] saying how
+pronounced it is: how far an engulfing body exceeds the one it engulfs, how
+long a hammer's lower shadow is against its range, how far a star's third
+bar retraces the first, and so on.
+"""
+import numpy as np
+
+# Pattern -> bias (+1 bullish, -1 bearish, 0 neutral)
+PATTERNS = {
+    'bullish engulfing': 1,
+    'bearish engulfing': -1,
+    'hammer': 1,
+    'shooting star': -1,
+    'doji': 0,
+    'inside bar': 0,
+    'outside bar': 0,
+    'morning star': 1,
+    'evening star': -1,
+    'three white soldiers': 1,
+    'three black crows': -1,
+}
+DOJI_BODY = 0.1  # Doji: body at most this fraction of the range
+SHADOW_RATIO = 2.0  # Hammer / shooting star: long shadow at least this many bodies...
+SMALL_SHADOW = 0.25  # ...and the other shadow at most this fraction of the range
+STAR_BODY = 0.3  # Middle bar of a morning/evening star: body at most this fraction of the first's
+TREND_BARS = 5  # Hammers and shooting stars need a move over this many bars into them
+LOOKBACK = TREND_BARS + 1  # Earlier bars any pattern looks at
+
+
+def _shift(x, k):
+    """x delayed by k bars along the last axis, NaN-padded"""
+    out = np.full_like(x, np.nan)
+    out[..., k:] = x[..., :x.shape[-1] - k]
+    return out
+
+
+def pattern_strengths(open_, high, low, close):
+    """{pattern: strength array} shaped like the inputs (bars on the last axis), 0 where absent"""
+    o, h, l, c = (np.asarray(x, dtype=float) for x in (open_, high, low, close))
+    body = c - o
+    size = np.abs(body)
+    span = h - l
+    upper = h - np.maximum(o, c)
+    lower = np.minimum(o, c) - l
+    po, ph, pl, pc = _shift(o, 1), _shift(h, 1), _shift(l, 1), _shift(c, 1)
+    pbody = pc - po
+    psize = np.abs(pbody)
+    prior = pc - _shift(c, 1 + TREND_BARS)  # Move into the bar
+    # Three-bar patterns: bars t-2 (first), t-1 (middle), t
+    fo, fc = _shift(o, 2), _shift(c, 2)
+    fbody = fc - fo
+    fsize = np.abs(fbody)
+    fmid = (fo + fc) / 2
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        engulf = 1 - psize / size
+        middle_small = np.abs(pbody) <= STAR_BODY * fsize
+        rising = (body > 0) & (pbody > 0) & (fbody > 0) & (c > pc) & (pc > fc)
+        falling = (body < 0) & (pbody < 0) & (fbody < 0) & (c < pc) & (pc < fc)
+        opens_in_bodies = ((o - po) * (o - pc) <= 0) & ((po - fo) * (po - fc) <= 0)
+        thirds = (size / span + _shift(size / span, 1) + _shift(size / span, 2)) / 3
+        found = {
+            'bullish engulfing': ((pbody < 0) & (body > 0) & (o <= pc) & (c >= po) & (size > psize), engulf),
+            'bearish engulfing': ((pbody > 0) & (body < 0) & (o >= pc) & (c <= po) & (size > psize), engulf),
+            'hammer': ((span > 0) & (lower >= SHADOW_RATIO * size) & (upper <= SMALL_SHADOW * span) & (prior < 0), lower / span),
+            'shooting star': ((span > 0) & (upper >= SHADOW_RATIO * size) & (lower <= SMALL_SHADOW * span) & (prior > 0), upper / span),
+            'doji': ((span > 0) & (size <= DOJI_BODY * span), 1 - size / span),
+            'inside bar': ((h < ph) & (l > pl), 1 - span / (ph - pl)),
+            'outside bar': ((h > ph) & (l < pl), 1 - (ph - pl) / span),
+            'morning star': ((fbody < 0) & middle_small & ((po + pc) / 2 < fc) & (body > 0) & (c > fmid),
+                             np.clip((c - fc) / fsize, 0, 1)),
+            'evening star': ((fbody > 0) & middle_small & ((po + pc) / 2 > fc) & (body < 0) & (c < fmid),
+                             np.clip((fc - c) / fsize, 0, 1)),
+            'three white soldiers': (rising & opens_in_bodies, thirds),
+            'three black crows': (falling & opens_in_bodies, thirds),
+        }
+        return {name: np.where(hit, np.nan_to_num(strength), 0.0) for name, (hit, strength) in found.items()}
+
+
+def scan_frames(frames, bars=1):
+    """Patterns on the newest `bars` bars of every frame, in one stacked pass.
+
+    frames maps a name (e.g. a timeframe) to (open, high, low, close) arrays,
+    oldest first. Returns {name: [(index, pattern, strength)]}, index being
+    the bar's position in its frame, oldest hits first.
+    """
+    names = [name for name, (open_, _, _, _) in frames.items() if len(open_)]
+    result = {name: [] for name in frames}
+    if not names:
+        return result
+    width = bars + LOOKBACK
+    stacked = np.full((4, len(names), width), np.nan)
+    for i, name in enumerate(names):
+        for j, series in enumerate(frames[name]):
+            tail = np.asarray(series, dtype=float)[-width:]
+            stacked[j, i, width - len(tail):] = tail
+    lengths = [len(frames[name][0]) for name in names]
+    for pattern, strength in pattern_strengths(*stacked).items():
+        rows, cols = np.nonzero(strength[:, -bars:])
+        for row, col in zip(rows, cols):
+            index = lengths[row] - bars + col
+            if index >= 0:
+                result[names[row]].append((int(index), pattern, float(strength[row, width - bars + col])))
+    for hits in result.values():
+        hits.sort(key=lambda hit: hit[0])
+    return result
+
+
+def scan(open_, high, low, close):
+    """Every pattern over whole arrays: [(index, pattern, strength)], oldest first"""
+    return scan_frames({None: (open_, high, low, close)}, bars=len(open_))[None]
+
+
+def describe(pattern):
+    """Pattern name with its bias spelled out where the name doesn't say it"""
+    bias = {1: 'bullish', -1: 'bearish'}.get(PATTERNS[pattern])
+    return f"{pattern} ({bias})" if bias and bias not in pattern else pattern
@@ -0,0 +1,84 @@
+"""NumPy-only linear regression trend channels.
+
+Slopes and intercepts for several series (high, low, close), several
+timeframes and several window lengths come out of one batched pass over
+suffix sums; the x sums for each window length are closed-form.
+"""
+import numpy as np
+
+DEFAULT_WINDOWS = (20,)
+
+
+def regress_tail(series, lengths, windows):
+    """Least-squares fit of the last w points of each row, for every w in windows.
+
+    series: (k, n) array, rows right-aligned (left padding is ignored).
+    lengths: valid points per row; windows longer than a row are clamped to it.
+    Returns (slope, intercept), each (k, len(windows)), with x running 0..w-1
+    inside each window.
+    """
+    y = np.asarray(series, dtype=float)
+    k, n = y.shape
+    w = np.minimum(np.asarray(windows)[None, :], np.asarray(lengths)[:, None])  # (k, W)
+    idx = np.arange(n, dtype=float)
+    # Column j-1 holds the sum over the last j points
+    suffix_y = np.cumsum(y[:, ::-1], axis=1)
+    suffix_iy = np.cumsum((y * idx)[:, ::-1], axis=1)
+    rows = np.arange(k)[:, None]
+    col = np.maximum(w - 1, 0)
+    sy = suffix_y[rows, col]
+    sxy = suffix_iy[rows, col] - (n - w) * sy  # Shift x to start at 0 in each window
+    sx = w * (w - 1) / 2
+    sxx = (w - 1) * w * (2 * w - 1) / 6
+    with np.errstate(divide='ignore', invalid='ignore'):
+        slope = (w * sxy - sx * sy) / (w * sxx - sx * sx)
+        intercept = (sy - slope * sx) / w
+    return slope, intercept
+
+
+def channel_status(price, upper, lower, slope_close):
+    if slope_close > 0:
+        channel_type = 'bullish'
+    elif slope_close < 0:
+        channel_type = 'bearish'
+    else:
+        channel_type = 'neutral'
+
+    if price > upper:
+        return f'exited above {channel_type} channel'
+    elif price < lower:
+        return f'exited below {channel_type} channel'
+    return f'within {channel_type} channel'
+
+
+def trend_channels(frames, windows=DEFAULT_WINDOWS):
+    """Channel status for every timeframe and window from one batched fit.
+
+    frames maps a timeframe name to (high, low, close) arrays, oldest first.
+    Returns {name: {window: status}}: the upper/lower lines are regressions on
+    highs/lows, direction comes from the regression on closes.
+    """
+    names = [name for name, (_, _, close) in frames.items() if len(close)]
+    if not names:
+        return {}
+    span = max(windows)
+    tails = [[np.asarray(s, dtype=float)[-span:] for s in frames[name]] for name in names]
+    lengths = [len(close) for _, _, close in tails]
+    width = max(lengths)
+    # Stack high/low/close of every timeframe as rows, right-aligned, zero padded
+    stacked = np.zeros((3 * len(names), width))
+    for i, series in enumerate(tails):
+        for j, s in enumerate(series):
+            stacked[3 * i + j, width - len(s):] = s
+    slope, intercept = regress_tail(stacked, np.repeat(lengths, 3), windows)
+    w = np.minimum(np.asarray(windows)[None, :], np.repeat(lengths, 3)[:, None])
+    line_end = slope * (w - 1) + intercept  # Fitted value at the newest bar
+
+    result = {}
+    for i, name in enumerate(names):
+        price = tails[i][2][-1]
+        result[name] = {
+            window: channel_status(price, line_end[3 * i, j], line_end[3 * i + 1, j], slope[3 * i + 2, j])
+            for j, window in enumerate(windows)
+        }
+    return result
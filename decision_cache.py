@@ -0,0 +1,80 @@
+"""Decision cache for xAI calls.
+
+The key is a quantized feature vector of what build_prompt feeds the model:
+price position against the VWAP bands, indicator buckets, channel states,
+alert counts (any new alert changes the key), position state and candle
+pattern. When a tick produces a key already answered recently, the previous
+answer is reused instead of calling xAI again. Coarser sensitivity steps mean
+more reuse; MAX_AGE bounds how long an answer is trusted.
+"""
+import math
+import time
+from collections import OrderedDict
+
+SENSITIVITY = {
+    'band_sd': 0.5,    # Price vs VWAP, in band standard deviations
+    'band_touch': 0.5,  # Same 'interacting with outer band' threshold as build_prompt ($)
+    'rsi': 5.0,        # RSI points
+    'macd_hist': 0.05,  # MACD histogram
+    'slope': 0.01,     # VWAP slope
+}
+MAX_AGE = 600  # Seconds before an unchanged key is asked again anyway
+MAX_ENTRIES = 64
+
+
+def _bucket(value, step):
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return None
+    return int(math.floor(value / step))
+
+
+def decision_key(current_data, slope, indicators, channels, alert_counts, position, candle, sensitivity=SENSITIVITY):
+    """Quantized, hashable summary of the prompt inputs that drive a decision"""
+    price = current_data['close']
+    vwap, sd = current_data['vwap'], current_data['sd']
+    band_position = _bucket((price - vwap) / sd, sensitivity['band_sd']) if sd and not math.isnan(sd) else None
+    touch = sensitivity['band_touch']
+    near_band = 'lower' if abs(price - current_data['lower3']) < touch else 'upper' if abs(price - current_data['upper3']) < touch else None
+    ema = indicators['ema_21']
+    ema_relation = None if math.isnan(ema) else (price > ema) - (price < ema)
+    return (
+        band_position,
+        near_band,
+        _bucket(slope, sensitivity['slope']),
+        _bucket(indicators['rsi'], sensitivity['rsi']),
+        _bucket(indicators['macd_hist'], sensitivity['macd_hist']),
+        ema_relation,
+        tuple(channels),
+        tuple(alert_counts),
+        (position['type'], position['contracts']) if position else None,
+        candle,
+    )
+
+
+class DecisionCache:
+    def __init__(self, max_age=MAX_AGE, max_entries=MAX_ENTRIES):
+        self.max_age = max_age
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (answer, stored_at)
+
+    def lookup(self, key):
+        """(True, answer) when key was answered within max_age, else (False, None)"""
+        entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[1] < self.max_age:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return True, entry[0]
+        self.misses += 1
+        return False, None
+
+    def store(self, key, answer):
+        self._entries[key] = (answer, time.monotonic())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def stats(self):
+        total = self.hits + self.misses
+        return {'hits': self.hits, 'misses': self.misses, 'hit_rate': round(self.hits / total, 3) if total else 0.0}
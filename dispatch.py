@@ -0,0 +1,128 @@
+"""Prioritized outbound dispatcher.
+
+Orders go out on their own worker the moment they are queued. Notifications
+are batched into as few Discord posts as fit the message limit, rate-limited,
+and sent on a separate worker, so a slow or failing Discord post never delays
+an order.
+"""
+import queue
+import threading
+import time
+
+DISCORD_LIMIT = 2000  # Characters per Discord message
+NOTIFY_INTERVAL = 2.0  # Minimum seconds between Discord posts
+MAX_PENDING_NOTES = 100  # Oldest notes are dropped beyond this
+
+_STOP = object()
+
+
+class OutboundDispatcher:
+    def __init__(self, send_order, send_note, notify_interval=NOTIFY_INTERVAL, max_pending=MAX_PENDING_NOTES):
+        self.send_order = send_order
+        self.send_note = send_note
+        self.notify_interval = notify_interval
+        self.max_pending = max_pending
+        self.orders_sent = 0
+        self.notes_sent = 0
+        self.notes_dropped = 0
+        self.note_failures = 0
+        self._orders = queue.Queue()
+        self._notes = []  # [key, message]; keyed notes replace their pending predecessor
+        self._notes_cv = threading.Condition()
+        self._stopping = False
+        self._last_post = 0.0
+        self._order_thread = threading.Thread(target=self._order_loop, name='orders', daemon=True)
+        self._note_thread = threading.Thread(target=self._note_loop, name='notifications', daemon=True)
+        self._order_thread.start()
+        self._note_thread.start()
+
+    def order(self, *args, **kwargs):
+        """Queue an order for immediate sending"""
+        self._orders.put((args, kwargs))
+
+    def notify(self, message, key=None):
+        """Queue a notification. A pending note with the same key is replaced,
+        so e.g. only the newest prompt dump is posted if several pile up."""
+        with self._notes_cv:
+            if key is not None:
+                for note in self._notes:
+                    if note[0] == key:
+                        note[1] = message
+                        return
+            self._notes.append([key, message])
+            if len(self._notes) > self.max_pending:
+                del self._notes[0]
+                self.notes_dropped += 1
+            self._notes_cv.notify()
+
+    def _order_loop(self):
+        while True:
+            item = self._orders.get()
+            if item is _STOP:
+                return
+            args, kwargs = item
+            try:
+                self.send_order(*args, **kwargs)
+                self.orders_sent += 1
+            except Exception as e:
+                print(f"Order dispatch failed: {e}")
+
+    def _pack(self, messages):
+        """Join messages into as few posts as fit DISCORD_LIMIT"""
+        posts, current = [], ''
+        for message in messages:
+            if len(message) > DISCORD_LIMIT:
+                message = message[:DISCORD_LIMIT - 1] + '…'
+            if current and len(current) + 1 + len(message) > DISCORD_LIMIT:
+                posts.append(current)
+                current = ''
+            current = f'{current}\n{message}' if current else message
+        if current:
+            posts.append(current)
+        return posts
+
+    def _note_loop(self):
+        while True:
+            with self._notes_cv:
+                while not self._notes and not self._stopping:
+                    self._notes_cv.wait()
+                if not self._notes:
+                    return
+            wait = self._last_post + self.notify_interval - time.monotonic()
+            if wait > 0 and not self._stopping:
+                time.sleep(wait)
+            with self._notes_cv:
+                batch, self._notes = self._notes, []
+            for i, post in enumerate(self._pack([message for _, message in batch])):
+                wait = self._last_post + self.notify_interval - time.monotonic()
+                if i and wait > 0 and not self._stopping:
+                    time.sleep(wait)
+                try:
+                    ok = self.send_note(post)
+                except Exception as e:
+                    print(f"Notification failed: {e}")
+                    ok = False
+                if ok is False:
+                    self.note_failures += 1
+                else:
+                    self.notes_sent += 1
+                self._last_post = time.monotonic()
+
+    def stats(self):
+        return {
+            'orders_pending': self._orders.qsize(),
+            'orders_sent': self.orders_sent,
+            'notes_pending': len(self._notes),
+            'notes_sent': self.notes_sent,
+            'notes_dropped': self.notes_dropped,
+            'note_failures': self.note_failures,
+        }
+
+    def stop(self, timeout=10):
+        """Send queued orders, flush pending notifications, then stop both workers"""
+        self._orders.put(_STOP)
+        self._order_thread.join(timeout)
+        with self._notes_cv:
+            self._stopping = True
+            self._notes_cv.notify()
+        self._note_thread.join(timeout)
@@ -0,0 +1,52 @@
+"""Concurrent data-gathering stage for the main loop.
+
+Independent inputs are fetched in parallel under a per-tick deadline. An
+input that misses the deadline or fails is replaced by its last-known value
+and reported as stale. A late fetch keeps running in the background and its
+result becomes the last-known value; it is not started again while still
+running, so one slow site cannot pile up requests.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+
+
+class InputGatherer:
+    def __init__(self, max_workers=8):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='gather')
+        self.last_known = {}  # name -> last successfully fetched value
+        self.last_elapsed = 0.0
+        self._running = {}  # name -> future, possibly still running from an earlier tick
+
+    def _remember(self, name, future):
+        if future.exception() is None:
+            self.last_known[name] = future.result()
+        else:
+            print(f"Input {name} failed: {future.exception()}")
+
+    def gather(self, tasks, deadline):
+        """Run tasks ({name: callable}) in parallel for up to deadline seconds.
+
+        Returns (values, stale): values maps every name to its fresh result or
+        last-known value (None if there never was one); stale lists the names
+        that were not fetched fresh this tick.
+        """
+        start = time.monotonic()
+        futures = {}
+        for name, fn in tasks.items():
+            future = self._running.get(name)
+            if future is None or future.done():
+                future = self.pool.submit(fn)
+                future.add_done_callback(partial(self._remember, name))
+                self._running[name] = future
+            futures[name] = future
+        done, _ = wait(futures.values(), timeout=deadline)
+        values, stale = {}, []
+        for name, future in futures.items():
+            if future in done and future.exception() is None:
+                values[name] = future.result()
+            else:
+                values[name] = self.last_known.get(name)
+                stale.append(name)
+        self.last_elapsed = time.monotonic() - start
+        return values, stale
@@ -0,0 +1,89 @@
+"""Shared HTTP client for all outbound calls.
+
+One pooled requests.Session keeps connections alive per host, so repeat
+calls skip the TCP+TLS handshake. Timeouts are set per endpoint, idempotent
+reads retry a bounded number of times with jittered backoff, and latency is
+recorded per host.
+"""
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# (connect, read) timeouts in seconds, by host
+TIMEOUTS = {
+    'api.tradier.com': (3, 10),
+    'api.x.ai': (5, 60),
+    'discord.com': (3, 10),
+    'webhooks.traderspost.io': (3, 10),
+}
+DEFAULT_TIMEOUT = (5, 15)
+
+READ_RETRIES = 2  # Extra attempts for GETs
+BACKOFF = 0.5  # Base seconds; attempt n sleeps uniform(0, BACKOFF * 2**n)
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+LATENCY_SAMPLES = 500  # Per host
+
+session = requests.Session()
+_adapter = HTTPAdapter(pool_connections=16, pool_maxsize=16)
+session.mount('https://', _adapter)
+session.mount('http://', _adapter)
+
+_latency = {}  # host -> deque of (seconds, ok)
+_latency_lock = threading.Lock()
+
+
+def _record(host, seconds, ok):
+    with _latency_lock:
+        if host not in _latency:
+            _latency[host] = deque(maxlen=LATENCY_SAMPLES)
+        _latency[host].append((seconds, ok))
+
+
+def request(method, url, retries=0, **kwargs):
+    """session.request with the endpoint's timeouts and up to `retries` jittered retries"""
+    host = urlparse(url).hostname
+    kwargs.setdefault('timeout', TIMEOUTS.get(host, DEFAULT_TIMEOUT))
+    for attempt in range(retries + 1):
+        start = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except (requests.ConnectionError, requests.Timeout):
+            _record(host, time.perf_counter() - start, False)
+            if attempt == retries:
+                raise
+        else:
+            _record(host, time.perf_counter() - start, response.ok)
+            if response.status_code not in RETRY_STATUSES or attempt == retries:
+                return response
+        time.sleep(random.uniform(0, BACKOFF * 2 ** attempt))
+
+
+def get(url, retries=READ_RETRIES, **kwargs):
+    return request('GET', url, retries=retries, **kwargs)
+
+
+def post(url, **kwargs):
+    """POSTs are not retried: orders and messages must not be sent twice"""
+    return request('POST', url, **kwargs)
+
+
+def latency_stats():
+    """Per-host request count, error count and p50/p95/max latency in ms"""
+    with _latency_lock:
+        samples = {host: list(values) for host, values in _latency.items()}
+    stats = {}
+    for host, values in samples.items():
+        times = sorted(s for s, _ in values)
+        stats[host] = {
+            'count': len(times),
+            'errors': sum(1 for _, ok in values if not ok),
+            'p50_ms': round(times[len(times) // 2] * 1000, 1),
+            'p95_ms': round(times[min(int(len(times) * 0.95), len(times) - 1)] * 1000, 1),
+            'max_ms': round(times[-1] * 1000, 1),
+        }
+    return stats
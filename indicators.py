@@ -0,0 +1,246 @@
+"""Streaming indicators: each new 1-min bar updates RSI, MACD, ATR, EMA and
+anchored VWAP in O(1).
+
+Definitions match the full-history versions compute_indicators used before:
+- RSI: Wilder smoothing (EWM alpha=1/n, seeded with the first bar), valid after n bars
+- MACD: EMA(fast) - EMA(slow), both seeded with the first close; signal is an
+  EMA of MACD seeded with its first valid value
+- ATR: simple mean of the first n true ranges, then Wilder smoothing
+- EMA: seeded with the SMA of the first n closes
+Feeding a bar with the same key as the previous one replaces it, so a
+partial bar can be revised as it fills in.
+"""
+import math
+from collections import deque
+
+NAN = float('nan')
+
+
+class StreamingIndicators:
+    def __init__(self, rsi_len=14, macd_fast=12, macd_slow=26, macd_signal=9, atr_len=14, ema_len=21):
+        self.rsi_len = rsi_len
+        self.macd_fast = macd_fast
+        self.macd_slow = macd_slow
+        self.macd_signal = macd_signal
+        self.atr_len = atr_len
+        self.ema_len = ema_len
+        self.reset()
+
+    def reset(self):
+        self.last_key = None
+        self._state = {
+            'n': 0, 'prev_close': NAN,
+            'up_avg': 0.0, 'dn_avg': 0.0,
+            'ema_fast': NAN, 'ema_slow': NAN,
+            'macd': NAN, 'macd_n': 0, 'signal': NAN,
+            'tr_sum': 0.0, 'atr': NAN,
+            'close_sum': 0.0, 'ema': NAN,
+        }
+        self._prev_state = None  # State before the last bar, for revisions
+
+    def _step(self, s, high, low, close):
+        n = s['n']
+        if n == 0:
+            diff = 0.0
+            tr = high - low
+        else:
+            prev = s['prev_close']
+            diff = close - prev
+            tr = max(high - low, abs(high - prev), abs(low - prev))
+
+        # RSI
+        a = 1.0 / self.rsi_len
+        up = diff if diff > 0 else 0.0
+        dn = -diff if diff < 0 else 0.0
+        if n == 0:
+            s['up_avg'], s['dn_avg'] = up, dn
+        else:
+            s['up_avg'] += a * (up - s['up_avg'])
+            s['dn_avg'] += a * (dn - s['dn_avg'])
+
+        # MACD
+        if n == 0:
+            s['ema_fast'] = s['ema_slow'] = close
+        else:
+            s['ema_fast'] += 2.0 / (self.macd_fast + 1) * (close - s['ema_fast'])
+            s['ema_slow'] += 2.0 / (self.macd_slow + 1) * (close - s['ema_slow'])
+        if n + 1 >= self.macd_slow:
+            s['macd'] = s['ema_fast'] - s['ema_slow']
+            if s['macd_n'] == 0:
+                s['signal'] = s['macd']
+            else:
+                s['signal'] += 2.0 / (self.macd_signal + 1) * (s['macd'] - s['signal'])
+            s['macd_n'] += 1
+
+        # ATR
+        if n < self.atr_len:
+            s['tr_sum'] += tr
+            if n == self.atr_len - 1:
+                s['atr'] = s['tr_sum'] / self.atr_len
+        else:
+            s['atr'] = (s['atr'] * (self.atr_len - 1) + tr) / self.atr_len
+
+        # EMA
+        if n < self.ema_len:
+            s['close_sum'] += close
+            if n == self.ema_len - 1:
+                s['ema'] = s['close_sum'] / self.ema_len
+        else:
+            s['ema'] += 2.0 / (self.ema_len + 1) * (close - s['ema'])
+
+        s['prev_close'] = close
+        s['n'] = n + 1
+
+    def update(self, key, high, low, close):
+        """Feed one bar; key orders bars (e.g. the 'date' string). Returns values()."""
+        if self.last_key is not None and key < self.last_key:
+            return self.values()  # Older than what we have; already accounted for
+        if self.last_key is not None and key == self.last_key:
+            self._state = dict(self._prev_state)  # Revision of the last bar
+        self._prev_state = dict(self._state)
+        self._step(self._state, float(high), float(low), float(close))
+        self.last_key = key
+        return self.values()
+
+    def warm_start(self, keys, highs, lows, closes):
+        """Seed from history, oldest bar first"""
+        for key, high, low, close in zip(keys, highs, lows, closes):
+            self.update(key, high, low, close)
+        return self.values()
+
+    def values(self):
+        s = self._state
+        n = s['n']
+        rsi = NAN
+        if n >= self.rsi_len:
+            if s['dn_avg'] > 0:
+                rsi = 100.0 - 100.0 / (1.0 + s['up_avg'] / s['dn_avg'])
+            elif s['up_avg'] > 0:
+                rsi = 100.0
+        macd = s['macd'] if n >= self.macd_slow else NAN
+        signal = s['signal'] if s['macd_n'] >= self.macd_signal else NAN
+        return {
+            'rsi': rsi,
+            'macd': macd,
+            'macd_signal': signal,
+            'macd_hist': macd - signal if not (math.isnan(macd) or math.isnan(signal)) else NAN,
+            'atr': s['atr'],
+            f'ema_{self.ema_len}': s['ema'],
+        }
+
+
+class AnchoredVWAP:
+    """Anchored VWAP with rolling SD bands and a closed-form rolling slope.
+
+    anchor is either 'HH:MM' (restart at the first bar of each day at or after
+    that time, e.g. '09:33' for the session) or 'prior_close' (restart at the
+    first bar of each day, seeded with the previous day's last bar). Bar keys
+    are Tradier 'YYYY-MM-DDTHH:MM:SS' dates. Band SD is the sample SD of
+    (typical price - VWAP) over the last band_len bars; slope is the
+    least-squares slope of the last slope_len VWAP values. Bars before the
+    first one with volume have no VWAP and are left out of both windows.
+    """
+
+    def __init__(self, anchor='09:33', band_len=20, slope_len=10):
+        self.anchor = anchor
+        self.band_len = band_len
+        self.slope_len = slope_len
+        self.last_key = None
+        self._state = self._fresh(None)
+        self._prev_state = None
+        self._last_bar = None  # Last bar fed, for the prior-close anchor
+        self._prev_last_bar = None
+
+    def _fresh(self, day):
+        return {
+            'day': day, 'active': False,
+            'pv': 0.0, 'v': 0.0, 'vwap': NAN,
+            'devs': deque(), 'dev_sum': 0.0, 'dev_sq': 0.0,
+            'vwaps': deque(), 'y_sum': 0.0, 'xy_sum': 0.0,
+        }
+
+    @staticmethod
+    def _copy(state):
+        copy = dict(state)
+        copy['devs'] = deque(state['devs'])
+        copy['vwaps'] = deque(state['vwaps'])
+        return copy
+
+    def _add(self, s, high, low, close, volume):
+        tp = (high + low + close) / 3
+        s['pv'] += tp * volume
+        s['v'] += volume
+        vwap = s['pv'] / s['v'] if s['v'] else NAN
+        s['vwap'] = vwap
+        if not s['v']:
+            return  # No volume since the anchor yet: a NaN would stay in the windowed sums
+
+        dev = tp - vwap
+        s['devs'].append(dev)
+        s['dev_sum'] += dev
+        s['dev_sq'] += dev * dev
+        if len(s['devs']) > self.band_len:
+            old = s['devs'].popleft()
+            s['dev_sum'] -= old
+            s['dev_sq'] -= old * old
+
+        # Slide the slope window: x runs 0..m-1 over the kept VWAPs
+        m = len(s['vwaps'])
+        if m == self.slope_len:
+            old = s['vwaps'].popleft()
+            s['xy_sum'] += -(s['y_sum'] - old) + (m - 1) * vwap
+            s['y_sum'] += vwap - old
+        else:
+            s['xy_sum'] += m * vwap
+            s['y_sum'] += vwap
+        s['vwaps'].append(vwap)
+
+    def update(self, key, high, low, close, volume):
+        """Feed one bar (same key as the last one = revision). Returns (row, slope)."""
+        if self.last_key is not None and key < self.last_key:
+            return self.values()
+        if self.last_key is not None and key == self.last_key:
+            self._state = self._copy(self._prev_state)
+            self._last_bar = self._prev_last_bar
+        self._prev_state = self._copy(self._state)
+        self._prev_last_bar = self._last_bar
+
+        bar = (key, float(high), float(low), float(close), float(volume))
+        day = key[:10]
+        s = self._state
+        if day != s['day']:
+            s = self._state = self._fresh(day)
+            if self.anchor == 'prior_close' and self._last_bar is not None:
+                s['active'] = True
+                self._add(s, *self._last_bar[1:])
+        if not s['active'] and self.anchor != 'prior_close' and key[11:16] >= self.anchor:
+            s['active'] = True
+        if s['active']:
+            self._add(s, *bar[1:])
+        self._last_bar = bar
+        self.last_key = key
+        return self.values()
+
+    def values(self):
+        """(row, slope): row holds the last bar plus vwap, sd and the +-2/3 SD bands"""
+        s = self._state
+        bar = self._last_bar or (None, NAN, NAN, NAN, NAN)
+        vwap = s['vwap'] if s['active'] else NAN
+        sd = NAN
+        n = len(s['devs'])
+        if s['active'] and n >= self.band_len:
+            var = (s['dev_sq'] - s['dev_sum'] * s['dev_sum'] / n) / (n - 1)
+            sd = math.sqrt(max(var, 0.0))
+        slope = NAN
+        m = len(s['vwaps'])
+        if s['active'] and m >= 2:
+            x_sum = m * (m - 1) / 2
+            xx_sum = (m - 1) * m * (2 * m - 1) / 6
+            slope = (m * s['xy_sum'] - x_sum * s['y_sum']) / (m * xx_sum - x_sum * x_sum)
+        row = {
+            'date': bar[0], 'high': bar[1], 'low': bar[2], 'close': bar[3], 'volume': bar[4],
+            'vwap': vwap, 'sd': sd,
+            'upper3': vwap + 3 * sd, 'lower3': vwap - 3 * sd,
+            'upper2': vwap + 2 * sd, 'lower2': vwap - 2 * sd,
+        }
+        return row, slope
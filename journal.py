@@ -0,0 +1,405 @@
+"""Append-only JSON Lines journal for LuxAlgo alerts.
+
+Each alert is one line in <prefix>_<YYYY-MM-DD>.jsonl, so writing an alert
+costs the same no matter how many came before it. A new file starts every day.
+Appends are single O_APPEND writes under flock, so several webhook worker
+processes can share a journal without interleaving lines.
+Older <prefix>_<date>.json day files (one JSON list) are still readable and can
+be converted with:  python journal.py convert lux_*_2025-12-04.json
+"""
+import fcntl
+import json
+import os
+import queue
+import sys
+import threading
+import time
+from collections import deque
+from datetime import datetime
+
+try:
+    import orjson  # Optional: faster decoding of payloads and journal lines
+except ImportError:
+    orjson = None
+
+# fsync after this many records, or once this many seconds have passed since
+# the last fsync. Every record is flushed to the OS immediately either way.
+FSYNC_EVERY = 20
+FSYNC_INTERVAL = 1.0
+
+# Alerts kept per (prefix, tf) and per prefix by AlertIndex
+HISTORY_LEN = 1000
+
+
+def day_stamp(when=None):
+    return (when or datetime.now()).strftime('%Y-%m-%d')
+
+
+def journal_path(prefix, date=None, base_dir='.'):
+    return os.path.join(base_dir, f'{prefix}_{date or day_stamp()}.jsonl')
+
+
+def legacy_path(prefix, date=None, base_dir='.'):
+    return os.path.join(base_dir, f'{prefix}_{date or day_stamp()}.json')
+
+
+def encode_alert(data):
+    return json.dumps(data, separators=(',', ':')) + '\n'
+
+
+def decode_alert(data):
+    """json.loads, through orjson when installed. Input only the stdlib accepts
+    (NaN, Infinity) falls back to it; invalid JSON raises json.JSONDecodeError."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
+
+
+def alert_ticker(alert):
+    """Symbol an alert is for ('AMEX:SPY' -> 'SPY'), or None if it doesn't say"""
+    ticker = alert.get('ticker')
+    return str(ticker).split(':')[-1].upper() if ticker else None
+
+
+def read_lines(path):
+    """Decode a .jsonl file, skipping blank or partially written lines"""
+    alerts = []
+    try:
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    alerts.append(decode_alert(line))
+                except json.JSONDecodeError:
+                    continue
+    except FileNotFoundError:
+        pass
+    return alerts
+
+
+def read_legacy(path):
+    """Load an old-style day file holding a single JSON list"""
+    try:
+        with open(path, 'r') as f:
+            alerts = json.load(f)
+        return alerts if isinstance(alerts, list) else []
+    except (FileNotFoundError, json.decoder.JSONDecodeError, ValueError):
+        return []
+
+
+def read_alerts(prefix, date=None, base_dir='.'):
+    """All alerts for a day, legacy .json records first, then the .jsonl journal"""
+    return read_legacy(legacy_path(prefix, date, base_dir)) + read_lines(journal_path(prefix, date, base_dir))
+
+
+class AlertJournal:
+    """One append handle per prefix, rotated at midnight, with batched fsyncs"""
+
+    def __init__(self, base_dir='.', fsync_every=FSYNC_EVERY, fsync_interval=FSYNC_INTERVAL):
+        self.base_dir = base_dir
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self._files = {}  # prefix -> {'date', 'path', 'fd', 'unsynced', 'last_sync'}
+        self._lock = threading.Lock()
+
+    def _handle(self, prefix):
+        today = day_stamp()
+        entry = self._files.get(prefix)
+        if entry and entry['date'] == today:
+            return entry
+        if entry:
+            self._sync(entry)
+            os.close(entry['fd'])
+        path = journal_path(prefix, today, self.base_dir)
+        entry = {
+            'date': today,
+            'path': path,
+            'fd': os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644),
+            'unsynced': 0,
+            'last_sync': time.monotonic(),
+        }
+        self._files[prefix] = entry
+        return entry
+
+    def _sync(self, entry):
+        if entry['unsynced']:
+            os.fsync(entry['fd'])
+            entry['unsynced'] = 0
+        entry['last_sync'] = time.monotonic()
+
+    def append(self, prefix, data):
+        return self.append_many(prefix, [data])
+
+    def append_many(self, prefix, records):
+        """Append records as one write; returns the journal path"""
+        payload = memoryview(''.join(encode_alert(r) for r in records).encode())
+        with self._lock:
+            entry = self._handle(prefix)
+            fcntl.flock(entry['fd'], fcntl.LOCK_EX)  # Other processes' appends wait for the whole batch
+            try:
+                while payload:
+                    payload = payload[os.write(entry['fd'], payload):]
+            finally:
+                fcntl.flock(entry['fd'], fcntl.LOCK_UN)
+            entry['unsynced'] += len(records)
+            if (entry['unsynced'] >= self.fsync_every
+                    or time.monotonic() - entry['last_sync'] >= self.fsync_interval):
+                self._sync(entry)
+            return entry['path']
+
+    def sync(self):
+        """fsync every open journal that has unsynced records"""
+        with self._lock:
+            for entry in self._files.values():
+                self._sync(entry)
+
+    def close(self):
+        with self._lock:
+            for entry in self._files.values():
+                self._sync(entry)
+                os.close(entry['fd'])
+            self._files.clear()
+
+
+class AlertIndex:
+    """Tails today's journals and indexes alerts by (prefix, tf).
+
+    refresh() reads only the bytes appended since the previous call, so a
+    tick costs the same however many alerts the day already holds. Keeps the
+    latest alert (highest bartime) and recent history per (prefix, tf), plus
+    recent alerts per prefix in arrival order. With a ticker, only that
+    symbol's alerts (and alerts that name no ticker) are indexed.
+    """
+
+    def __init__(self, prefixes, base_dir='.', history_len=HISTORY_LEN, ticker=None):
+        self.prefixes = list(prefixes)
+        self.base_dir = base_dir
+        self.history_len = history_len
+        self.ticker = ticker
+        self._reset(day_stamp())
+
+    def _reset(self, date):
+        self.date = date
+        self.latest = {}   # (prefix, tf) -> alert with the highest bartime
+        self.history = {}  # (prefix, tf) -> deque of alerts, oldest first
+        self.recent = {}   # prefix -> deque of alerts in arrival order
+        self.counts = {}   # prefix -> alerts seen today
+        self.tf_counts = {}  # (prefix, tf) -> alerts seen today
+        self._files = {}   # prefix -> (inode, offset) of the journal
+        for prefix in self.prefixes:
+            self._clear(prefix)
+            for alert in read_legacy(legacy_path(prefix, date, self.base_dir)):
+                self._add(prefix, alert)
+
+    def _clear(self, prefix):
+        for key in [k for k in self.latest if k[0] == prefix]:
+            del self.latest[key]
+        for key in [k for k in self.history if k[0] == prefix]:
+            del self.history[key]
+            del self.tf_counts[key]
+        self.recent[prefix] = deque(maxlen=self.history_len)
+        self.counts[prefix] = 0
+        self._files.pop(prefix, None)
+
+    def _add(self, prefix, alert):
+        if not isinstance(alert, dict):
+            return
+        if self.ticker and alert_ticker(alert) not in (None, self.ticker):
+            return
+        key = (prefix, alert.get('tf'))
+        latest = self.latest.get(key)
+        if latest is None or alert.get('bartime', 0) > latest.get('bartime', 0):
+            self.latest[key] = alert
+        if key not in self.history:
+            self.history[key] = deque(maxlen=self.history_len)
+            self.tf_counts[key] = 0
+        self.history[key].append(alert)
+        self.tf_counts[key] += 1
+        self.recent[prefix].append(alert)
+        self.counts[prefix] += 1
+
+    def _tail(self, prefix):
+        path = journal_path(prefix, self.date, self.base_dir)
+        try:
+            f = open(path, 'rb')
+        except FileNotFoundError:
+            return 0
+        with f:
+            st = os.fstat(f.fileno())
+            inode, offset = self._files.get(prefix, (st.st_ino, 0))
+            if inode != st.st_ino or st.st_size < offset:
+                # Journal was replaced (e.g. by convert_day_file): rebuild this prefix
+                self._clear(prefix)
+                for alert in read_legacy(legacy_path(prefix, self.date, self.base_dir)):
+                    self._add(prefix, alert)
+                offset = 0
+            f.seek(offset)
+            chunk = f.read()
+        end = chunk.rfind(b'\n') + 1  # leave a partially written last line for next time
+        self._files[prefix] = (st.st_ino, offset + end)
+        new = 0
+        for line in chunk[:end].splitlines():
+            if not line.strip():
+                continue
+            try:
+                self._add(prefix, decode_alert(line))
+                new += 1
+            except json.JSONDecodeError:
+                continue
+        return new
+
+    def refresh(self):
+        """Consume alerts appended since the last call; returns how many were new"""
+        today = day_stamp()
+        if today != self.date:
+            self._reset(today)
+        return sum(self._tail(prefix) for prefix in self.prefixes)
+
+    def latest_alert(self, prefix, tf):
+        return self.latest.get((prefix, tf))
+
+    def tf_history(self, prefix, tf):
+        return list(self.history.get((prefix, tf), ()))
+
+    def tf_count(self, prefix, tf):
+        return self.tf_counts.get((prefix, tf), 0)
+
+    def timeframes(self, prefix):
+        """Timeframes seen today for prefix, in order of first appearance"""
+        return [tf for p, tf in self.history if p == prefix]
+
+    def alerts(self, prefix):
+        return list(self.recent.get(prefix, ()))
+
+
+_STOP = object()
+
+
+class AlertWriter:
+    """Single background thread that drains queued alerts into an AlertJournal.
+
+    Alerts that arrive together are coalesced into one write per prefix, and
+    the journal is fsynced whenever the queue goes idle. on_flush(prefix,
+    records) is called after each successful write.
+    """
+
+    def __init__(self, journal, max_batch=500, idle_sync=FSYNC_INTERVAL, on_flush=None):
+        self.journal = journal
+        self.on_flush = on_flush
+        self.max_batch = max_batch
+        self.idle_sync = idle_sync
+        self.queue = queue.Queue()
+        self.written = 0
+        self.batches = 0
+        self.failed = 0
+        self.last_flush_ms = 0.0
+        self.max_flush_ms = 0.0
+        self._thread = threading.Thread(target=self._run, name='alert-writer', daemon=True)
+
+    def start(self):
+        self._thread.start()
+        return self
+
+    def put(self, prefix, data):
+        self.queue.put((prefix, data))
+
+    def depth(self):
+        return self.queue.qsize()
+
+    def stats(self):
+        return {
+            'queue_depth': self.depth(),
+            'written': self.written,
+            'batches': self.batches,
+            'failed': self.failed,
+            'last_flush_ms': round(self.last_flush_ms, 3),
+            'max_flush_ms': round(self.max_flush_ms, 3),
+        }
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            try:
+                item = self.queue.get(timeout=self.idle_sync)
+            except queue.Empty:
+                self.journal.sync()
+                continue
+            batch = []
+            while True:
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+                if len(batch) >= self.max_batch:
+                    break
+                try:
+                    item = self.queue.get_nowait()
+                except queue.Empty:
+                    break
+            if batch:
+                self._flush(batch)
+        self.journal.close()
+
+    def _flush(self, batch):
+        start = time.perf_counter()
+        grouped = {}
+        for prefix, data in batch:
+            grouped.setdefault(prefix, []).append(data)
+        for prefix, records in grouped.items():
+            try:
+                self.journal.append_many(prefix, records)
+                self.written += len(records)
+            except OSError as e:
+                self.failed += len(records)
+                print(f"Failed to write {len(records)} {prefix} alerts: {e}")
+                continue
+            if self.on_flush:
+                self.on_flush(prefix, records)
+        elapsed = (time.perf_counter() - start) * 1000
+        self.batches += 1
+        self.last_flush_ms = elapsed
+        self.max_flush_ms = max(self.max_flush_ms, elapsed)
+
+    def stop(self, timeout=10):
+        """Flush everything queued so far, then close the journal"""
+        if self._thread.is_alive():
+            self.queue.put(_STOP)
+            self._thread.join(timeout)
+
+
+def convert_day_file(path, remove=False):
+    """Convert a legacy <prefix>_<date>.json list into <prefix>_<date>.jsonl.
+
+    Records already in the .jsonl journal are kept after the legacy ones.
+    Run it for past days, or while webhook.py is stopped: the journal is
+    replaced, so a writer holding today's file open would lose its appends.
+    Returns the number of legacy records converted.
+    """
+    alerts = read_legacy(path)
+    target = os.path.splitext(path)[0] + '.jsonl'
+    existing = read_lines(target)
+    tmp = target + '.tmp'
+    with open(tmp, 'w') as f:
+        f.writelines(encode_alert(a) for a in alerts + existing)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, target)
+    if remove:
+        os.remove(path)
+    else:
+        os.rename(path, path + '.bak')
+    return len(alerts)
+
+
+if __name__ == '__main__':
+    if len(sys.argv) < 3 or sys.argv[1] != 'convert':
+        print("Usage: python journal.py convert <prefix>_<date>.json [...]")
+        sys.exit(1)
+    for legacy in sys.argv[2:]:
+        count = convert_day_file(legacy)
+        print(f"Converted {legacy} — {count} alerts")
@@ -0,0 +1,151 @@
+"""Columnar on-disk store for the session's 1-min market data.
+
+One memory-mapped .npy file per column, keyed by bar timestamp (int64 epoch
+seconds of the bar's wall-clock time). Appending a bar or correcting the
+newest one touches a single row, and range reads return views into the
+mapped files rather than copies. At the end of the day the directory is
+moved into the archive as a whole.
+"""
+import json
+import os
+
+import numpy as np
+
+COLUMNS = {
+    'timestamp': np.int64,
+    'open': np.float64,
+    'high': np.float64,
+    'low': np.float64,
+    'close': np.float64,
+    'volume': np.float64,
+}
+INITIAL_CAPACITY = 4096
+
+
+def to_epoch(dates):
+    """Tradier 'date' strings -> int64 epoch seconds"""
+    return np.asarray(dates, dtype='datetime64[s]').astype(np.int64)
+
+
+def to_dates(timestamps):
+    """int64 epoch seconds -> array of Tradier-style date strings"""
+    return np.asarray(timestamps, dtype=np.int64).astype('datetime64[s]').astype(str)
+
+
+def to_date(ts):
+    """int64 epoch seconds -> Tradier-style 'YYYY-MM-DDTHH:MM:SS' string"""
+    return str(np.datetime64(int(ts), 's'))
+
+
+class ColumnStore:
+    def __init__(self, directory='market_data', archive_dir='market_data_archive'):
+        self.directory = directory
+        self.archive_dir = archive_dir
+        self._open()
+
+    def _meta_path(self):
+        return os.path.join(self.directory, 'meta.json')
+
+    def _column_path(self, name):
+        return os.path.join(self.directory, f'{name}.npy')
+
+    def _open(self):
+        os.makedirs(self.directory, exist_ok=True)
+        try:
+            with open(self._meta_path(), 'r') as f:
+                meta = json.load(f)
+            self.length, self.capacity = meta['length'], meta['capacity']
+            self.columns = {name: np.load(self._column_path(name), mmap_mode='r+') for name in COLUMNS}
+        except (FileNotFoundError, KeyError, ValueError):
+            self.length, self.capacity = 0, INITIAL_CAPACITY
+            self.columns = {
+                name: np.lib.format.open_memmap(self._column_path(name), mode='w+', dtype=dtype, shape=(self.capacity,))
+                for name, dtype in COLUMNS.items()
+            }
+            self._write_meta()
+
+    def _write_meta(self):
+        tmp = self._meta_path() + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump({'length': self.length, 'capacity': self.capacity}, f)
+        os.replace(tmp, self._meta_path())
+
+    def _grow(self, needed):
+        capacity = self.capacity
+        while capacity < needed:
+            capacity *= 2
+        for name, dtype in COLUMNS.items():
+            path = self._column_path(name)
+            tmp = path + '.tmp.npy'
+            grown = np.lib.format.open_memmap(tmp, mode='w+', dtype=dtype, shape=(capacity,))
+            grown[:self.length] = self.columns[name][:self.length]
+            grown.flush()
+            del grown
+            self.columns[name] = None
+            os.replace(tmp, path)
+            self.columns[name] = np.load(path, mmap_mode='r+')
+        self.capacity = capacity
+
+    def __len__(self):
+        return self.length
+
+    def last_timestamp(self):
+        return int(self.columns['timestamp'][self.length - 1]) if self.length else None
+
+    def upsert(self, timestamps, values):
+        """Write bars keyed by timestamp: existing timestamps are overwritten in
+        place, newer ones are appended. timestamps must be sorted ascending;
+        values maps column name -> array aligned with timestamps."""
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if not len(timestamps):
+            return
+        stored = self.columns['timestamp'][:self.length]
+        last = stored[-1] if self.length else np.iinfo(np.int64).min
+        newer = timestamps > last
+        # Corrections to bars already stored
+        old = np.nonzero(~newer)[0]
+        if len(old):
+            pos = np.searchsorted(stored, timestamps[old])
+            found = pos < self.length
+            found[found] &= stored[pos[found]] == timestamps[old[found]]
+            for name in COLUMNS:
+                if name != 'timestamp':
+                    self.columns[name][pos[found]] = np.asarray(values[name])[old[found]]
+        new = np.nonzero(newer)[0]
+        if len(new):
+            end = self.length + len(new)
+            if end > self.capacity:
+                self._grow(end)
+            self.columns['timestamp'][self.length:end] = timestamps[new]
+            for name in COLUMNS:
+                if name != 'timestamp':
+                    self.columns[name][self.length:end] = np.asarray(values[name])[new]
+            self.length = end
+        for column in self.columns.values():
+            column.flush()
+        self._write_meta()
+
+    def read(self, start=None, end=None):
+        """Column views for bars with start <= timestamp < end (no copies)"""
+        stored = self.columns['timestamp'][:self.length]
+        lo = np.searchsorted(stored, start) if start is not None else 0
+        hi = np.searchsorted(stored, end) if end is not None else self.length
+        return {name: column[lo:hi] for name, column in self.columns.items()}
+
+    def rollover(self):
+        """Move the current store into the archive and start an empty one"""
+        if not self.length:
+            return None
+        stamp = to_date(self.columns['timestamp'][self.length - 1])[:10]
+        for name in list(self.columns):
+            self.columns[name].flush()
+        self.columns = {}
+        os.makedirs(self.archive_dir, exist_ok=True)
+        target = os.path.join(self.archive_dir, stamp)
+        suffix = 1
+        while os.path.exists(target):
+            suffix += 1
+            target = os.path.join(self.archive_dir, f'{stamp}_{suffix}')
+        os.replace(self.directory, target)
+        self._open()
+        return target
@@ -0,0 +1,165 @@
+"""Per-stage latency metrics.
+
+Recording a sample is a perf_counter call and a deque append under a lock
+(stages are recorded from pool and request threads); percentiles are only
+computed when metrics are rendered. Each process keeps its own Timings
+and writes a periodic JSON summary; webhook.py's /metrics route renders the
+merged summaries of every webhook worker plus bot.py's summary file in
+Prometheus text format.
+"""
+import glob
+import json
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+WINDOW = 1024  # Samples kept per stage for percentiles
+QUANTILES = (0.5, 0.9, 0.99)
+
+
+class Timings:
+    def __init__(self, window=WINDOW):
+        self.window = window
+        self._samples = {}  # stage -> deque of seconds
+        self._counts = {}
+        self._sums = {}
+        self._lock = threading.Lock()
+
+    def record(self, stage, seconds):
+        with self._lock:
+            samples = self._samples.get(stage)
+            if samples is None:
+                self._counts[stage] = 0
+                self._sums[stage] = 0.0
+                samples = self._samples[stage] = deque(maxlen=self.window)
+            samples.append(seconds)
+            self._counts[stage] += 1
+            self._sums[stage] += seconds
+
+    @contextmanager
+    def time(self, stage):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def timed(self, stage, fn):
+        """Wrap fn so each call is recorded under stage"""
+        def wrapper(*args, **kwargs):
+            with self.time(stage):
+                return fn(*args, **kwargs)
+        return wrapper
+
+    def summary(self, samples=False):
+        """{stage: {count, sum, max, quantiles: {q: seconds}}} over the rolling
+        window; with samples=True each stage also carries its window, so
+        summaries of several processes can be merged"""
+        with self._lock:
+            stages = [(stage, list(window), self._counts[stage], self._sums[stage]) for stage, window in self._samples.items()]
+        result = {}
+        for stage, window, count, total in stages:
+            if window:
+                result[stage] = summarize(window, count, total, samples)
+        return result
+
+
+def summarize(window, count, total, samples=False):
+    values = sorted(window)
+    stats = {
+        'count': count,
+        'sum': total,
+        'max': values[-1],
+        'quantiles': {str(q): values[min(int(q * len(values)), len(values) - 1)] for q in QUANTILES},
+    }
+    if samples:
+        stats['samples'] = [round(v, 7) for v in window]
+    return stats
+
+
+def merge_summaries(summaries):
+    """One summary of several processes' summary(samples=True): counts and sums
+    add up, quantiles are taken over the pooled windows"""
+    pooled = {}
+    for summary in summaries:
+        for stage, stats in summary.items():
+            merged = pooled.setdefault(stage, {'samples': [], 'count': 0, 'sum': 0.0})
+            merged['samples'].extend(stats['samples'])
+            merged['count'] += stats['count']
+            merged['sum'] += stats['sum']
+    return {stage: summarize(m['samples'], m['count'], m['sum']) for stage, m in pooled.items()}
+
+
+def write_summary(path, summary, **extra):
+    """Atomically write a stage summary (plus any extra sections) as JSON"""
+    tmp = f'{path}.{os.getpid()}.tmp'  # Several webhook workers may write the same file
+    with open(tmp, 'w') as f:
+        json.dump(dict(extra, updated_at=time.time(), stages=summary), f)
+    os.replace(tmp, path)
+
+
+def read_summary(path):
+    try:
+        with open(path, 'r') as f:
+            return json.load(f)
+    except (FileNotFoundError, json.decoder.JSONDecodeError, ValueError):
+        return None
+
+
+def pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def read_worker_summaries(prefix):
+    """{pid: summary} of the <prefix>_<pid>.json files of processes still running"""
+    summaries = {}
+    for path in glob.glob(f'{glob.escape(prefix)}_*.json'):
+        pid = path[len(prefix) + 1:-len('.json')]
+        if not pid.isdigit() or not pid_alive(int(pid)):
+            continue  # A worker that exited (or was killed) before removing its file
+        summary = read_summary(path)
+        if summary:
+            summaries[int(pid)] = summary
+    return summaries
+
+
+def start_summary_writer(path, snapshot, interval=60):
+    """Daemon thread writing snapshot() -> (summary, extra dict) to path every interval seconds"""
+    def run():
+        while True:
+            time.sleep(interval)
+            try:
+                summary, extra = snapshot()
+                write_summary(path, summary, **extra)
+            except OSError as e:
+                print(f"Failed to write metrics summary: {e}")
+    thread = threading.Thread(target=run, name='metrics-summary', daemon=True)
+    thread.start()
+    return thread
+
+
+def render_prometheus(prefix, summary, gauges=None):
+    """Prometheus text format: one summary metric per process, labelled by stage"""
+    name = f'{prefix}_stage_seconds'
+    lines = [f'# TYPE {name} summary']
+    for stage, stats in sorted(summary.items()):
+        for q, value in stats['quantiles'].items():
+            lines.append(f'{name}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+        lines.append(f'{name}_sum{{stage="{stage}"}} {stats["sum"]:.6f}')
+        lines.append(f'{name}_count{{stage="{stage}"}} {stats["count"]}')
+    typed = set()
+    for gauge, value in sorted((gauges or {}).items()):  # Keys may carry labels: 'name{host="x"}'
+        base = gauge.split('{')[0]
+        if base not in typed:
+            lines.append(f'# TYPE {prefix}_{base} gauge')
+            typed.add(base)
+        lines.append(f'{prefix}_{gauge} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,59 @@
+"""Bounded prompt context.
+
+Only the most recent few alerts per timeframe go into the prompt in full;
+older ones collapse to a count and the time of the latest of them. fit_prompt
+lowers the number kept until the whole prompt fits the character and token
+budget, so prompt size stops growing with the session.
+"""
+import time
+from datetime import datetime
+
+CHARS_PER_TOKEN = 4  # Rough estimate for English prompt text
+
+
+def estimate_tokens(text):
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+def alert_time(alert):
+    if 'bartime' not in alert:
+        return 'N/A'
+    return datetime.fromtimestamp(alert['bartime'] / 1000).strftime('%H:%M:%S')
+
+
+def compact_alerts(alerts, total, keep, format_alert, label):
+    """Format the last `keep` of alerts (oldest first) and summarize the rest.
+
+    total is how many alerts the timeframe had today; alerts may hold fewer.
+    Returns a list of strings, the summary first when anything was left out.
+    """
+    recent = alerts[-keep:] if keep else []
+    parts = [format_alert(a) for a in recent]
+    older = total - len(recent)
+    if older > 0:
+        summary = f"{label}: {older} earlier"
+        if len(alerts) > len(recent):
+            summary += f" (latest at {alert_time(alerts[-len(recent) - 1])})"
+        parts.insert(0, summary)
+    return parts
+
+
+def fit_prompt(render, max_chars, max_tokens, max_keep):
+    """Render with keep = max_keep, max_keep-1, ... 0 until the prompt fits the budget.
+
+    render(keep) builds the prompt keeping `keep` alerts per timeframe.
+    Returns (prompt, stats); stats['over_budget'] is set if even keep=0 did not fit.
+    """
+    start = time.perf_counter()
+    for keep in range(max_keep, -1, -1):
+        prompt = render(keep)
+        if len(prompt) <= max_chars and estimate_tokens(prompt) <= max_tokens:
+            break
+    stats = {
+        'chars': len(prompt),
+        'tokens': estimate_tokens(prompt),
+        'alerts_per_tf': keep,
+        'build_ms': (time.perf_counter() - start) * 1000,
+        'over_budget': len(prompt) > max_chars or estimate_tokens(prompt) > max_tokens,
+    }
+    return prompt, stats
@@ -0,0 +1,337 @@
+"""Replay recorded sessions through bot.py's decision pipeline.
+
+Each archived day (market_data_archive/<date>, written by the end-of-day
+rollover) is fed bar by bar through bot.process_tick, the same code the live
+loop runs, with that day's LuxAlgo alerts revealed as their bars close. A
+deterministic stand-in answers instead of xAI, orders are recorded instead of
+sent, and every worker runs in a scratch directory so a replay never touches
+the live position or market data. Days replay in parallel, one per process.
+Only the day's own bars are ticked; earlier days in an archive (written after
+a cold start) are used as warmup like the prior archived days.
+
+    python replay.py                              # every archived day
+    python replay.py 2025-12-01 2025-12-19        # a date range
+    python replay.py --strategy mymodule:decide --log trades.jsonl
+    python replay.py --symbol QQQ --archive market_data_archive_QQQ
+
+A strategy is any function taking the prompt and returning 'long', 'short',
+'close long', 'close short' or anything else for no action. Scraped
+fundamentals/macro and VIX aren't archived, so prompts carry bot.py's
+fallback values and a VIX of 0. P&L is in underlying points x contracts.
+"""
+import argparse
+import contextlib
+import importlib
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+from bar_ring import BarRing
+from decision_cache import DecisionCache
+from journal import AlertIndex, read_alerts
+from market_store import COLUMNS
+from scheduler import TickScheduler, session_time
+
+SYMBOL = 'SPY'
+ARCHIVE_DIR = 'market_data_archive'  # Other symbols archive to market_data_archive_<symbol>
+ALERT_DIR = '.'
+WARMUP_DAYS = 5  # Prior archived days of bars fed to the indicators first
+FUNDAMENTALS = (25.0, 1.5, "Technology: 30%, Financials: 15%")
+MACRO = (5.25, 3.2, 4.2)
+VIX = 0.0
+
+
+def band_rules(prompt):
+    """The prompt's stated strategy as fixed rules: enter on an outer band touch
+    with a matching candle, close on the opposite band"""
+    lower = 'interacting with lower outer band' in prompt
+    upper = 'interacting with upper outer band' in prompt
+    candle = re.search(r'Candle patterns.*?: (.*)', prompt)
+    candle = candle.group(1) if candle else ''
+    position = re.search(r'Current open position: (long|short)', prompt)
+    if position:
+        if position.group(1) == 'long' and upper:
+            return 'close long'
+        if position.group(1) == 'short' and lower:
+            return 'close short'
+    elif lower and 'bullish' in candle:
+        return 'long'
+    elif upper and 'bearish' in candle:
+        return 'short'
+    return 'hold'
+
+
+def hold(prompt):
+    """Never trades; isolates the stop-loss/partial-exit rules on nothing"""
+    return 'hold'
+
+
+STRATEGIES = {'band_rules': band_rules, 'hold': hold}
+
+
+def load_strategy(name):
+    """A built-in strategy name or 'module:function'"""
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+    module, _, attr = name.partition(':')
+    return getattr(importlib.import_module(module), attr)
+
+
+def tf_minutes(tf):
+    """Alert timeframe ('5', '5min', '1h') in minutes; 0 if unknown"""
+    match = re.fullmatch(r'(\d+)\s*(m|min|h|hr)?', str(tf).strip().lower())
+    if not match:
+        return 0
+    return int(match.group(1)) * (60 if match.group(2) in ('h', 'hr') else 1)
+
+
+def alert_arrival(alert):
+    """When an alert became available: the close of its bar (bartime is the bar open)"""
+    return datetime.fromtimestamp(alert['bartime'] / 1000) + timedelta(minutes=tf_minutes(alert.get('tf')))
+
+
+class ReplayAlertIndex(AlertIndex):
+    """AlertIndex over a recorded day: refresh() reveals the alerts that had
+    arrived by self.clock instead of tailing the journals"""
+
+    def __init__(self, prefixes, alerts, date, scratch_dir, ticker=None):
+        self.clock = None
+        self._pending = {}
+        self.skipped = 0  # Alerts without a bartime can't be placed in time
+        for prefix in prefixes:
+            timed = [a for a in alerts.get(prefix, []) if isinstance(a, dict) and 'bartime' in a]
+            self.skipped += len(alerts.get(prefix, [])) - len(timed)
+            self._pending[prefix] = deque(sorted(timed, key=alert_arrival))
+        super().__init__(prefixes, base_dir=scratch_dir, ticker=ticker)  # No journals there, nothing is read from disk
+        self.date = date
+
+    def refresh(self):
+        new = 0
+        for prefix in self.prefixes:
+            pending = self._pending[prefix]
+            while pending and alert_arrival(pending[0]) <= self.clock:
+                self._add(prefix, pending.popleft())
+                new += 1
+        return new
+
+
+class RecordingDispatcher:
+    """Stands in for bot.dispatcher: orders are logged at the bar's time and
+    price along with the position they acted on; notifications are counted"""
+
+    def __init__(self, bot):
+        self.bot = bot
+        self.orders = []
+        self.notes = 0
+        self.time = None
+        self.price = None
+
+    def order(self, ticker, action, quantity=None):
+        position = self.bot.positions.get(ticker)
+        self.orders.append({'time': self.time, 'price': self.price, 'ticker': ticker, 'action': action,
+                            'quantity': quantity, 'position': dict(position) if position else None})
+
+    def notify(self, message, key=None):
+        self.notes += 1
+
+    def stats(self):
+        return {'orders_sent': len(self.orders), 'notes_sent': self.notes}
+
+    def stop(self, timeout=None):
+        pass
+
+
+def trades_from_orders(orders, end_time, end_price):
+    """Pair recorded orders into trades with P&L; a position still open at the
+    end is marked at end_price"""
+    trades, trade = [], None
+    for order in orders:
+        position = order['position']
+        if order['action'] == 'buy':
+            trade = {'ticker': order['ticker'], 'type': position['type'], 'entry_time': order['time'], 'entry_price': order['price'],
+                     'contracts': position['contracts'], 'exits': [], 'pnl': 0.0, 'open': False}
+            trades.append(trade)
+            continue
+        if trade is None:
+            continue
+        quantity = order['quantity'] if order['action'] == 'sell' else position['contracts']
+        sign = 1 if trade['type'] == 'long' else -1
+        trade['pnl'] += sign * (order['price'] - trade['entry_price']) * quantity
+        trade['exits'].append({'time': order['time'], 'price': order['price'], 'quantity': quantity, 'action': order['action']})
+        if order['action'] == 'exit':
+            trade = None
+    if trade is not None:
+        remaining = trade['contracts'] - sum(e['quantity'] for e in trade['exits'])
+        sign = 1 if trade['type'] == 'long' else -1
+        trade['pnl'] += sign * (end_price - trade['entry_price']) * remaining
+        trade['exits'].append({'time': end_time, 'price': end_price, 'quantity': remaining, 'action': 'mark'})
+        trade['open'] = True
+    for trade in trades:
+        trade['pnl'] = round(trade['pnl'], 4)
+    return trades
+
+
+def archived_days(archive_dir=ARCHIVE_DIR):
+    """{date: [directories]} of archived sessions (a second rollover on the same day adds <date>_2)"""
+    days = {}
+    for name in sorted(os.listdir(archive_dir)):
+        if re.fullmatch(r'\d{4}-\d{2}-\d{2}(_\d+)?', name):
+            days.setdefault(name[:10], []).append(os.path.join(archive_dir, name))
+    return days
+
+
+def load_bars(directories):
+    """Bars from archived ColumnStore directories as a DataFrame with Tradier's columns"""
+    parts = []
+    for directory in directories:
+        with open(os.path.join(directory, 'meta.json'), 'r') as f:
+            length = json.load(f)['length']
+        parts.append(pd.DataFrame({name: np.load(os.path.join(directory, f'{name}.npy'), mmap_mode='r')[:length]
+                                   for name in COLUMNS}))
+    if not parts:
+        return pd.DataFrame(columns=['date'] + list(COLUMNS))
+    bars = pd.concat(parts, ignore_index=True).drop_duplicates('timestamp', keep='last').sort_values('timestamp')
+    bars.insert(0, 'date', bars['timestamp'].to_numpy().astype('datetime64[s]').astype(str))
+    return bars.reset_index(drop=True)
+
+
+_worker = {}
+
+
+def _init_worker(repo_dir, scratch_root, days, alert_dir, symbol, strategy, warmup_days, verbose):
+    scratch = tempfile.mkdtemp(dir=scratch_root)
+    os.chdir(scratch)  # bot.py's relative files (position, market_data, caches) land here
+    sys.path.insert(0, repo_dir)
+    import bot
+    bot.position_file = os.path.join(scratch, 'position.json')
+    _worker.update(bot=bot, scratch=scratch, days=days, alert_dir=alert_dir, symbol=symbol,
+                   strategy=load_strategy(strategy), warmup_days=warmup_days, verbose=verbose)
+
+
+def replay_day(date):
+    """Replay one archived session in this worker; returns its orders, trades and P&L"""
+    start = time.perf_counter()
+    bot, days, symbol = _worker['bot'], _worker['days'], _worker['symbol']
+    warmup_days = _worker['warmup_days']
+    prior = [d for d in sorted(days) if d < date][-warmup_days:] if warmup_days else []
+    # One frame without duplicate timestamps. An archive written after a cold start
+    # also holds the earlier days of the 30-day history; those only serve as warmup
+    frame = load_bars([directory for d in prior + [date] for directory in days[d]])
+    session = frame['date'].str[:10]
+    warmup = sorted(set(session[session < date]))[-warmup_days:] if warmup_days else []
+    frame = frame[session.isin(warmup) | (session == date)].reset_index(drop=True)
+    bars = int((frame['date'].str[:10] == date).sum())
+    times = pd.to_datetime(frame['date']).dt.to_pydatetime()
+    columns = {name: frame[name].to_numpy() for name in COLUMNS}
+    ring = BarRing()
+    first = max(len(frame) - bars, 1)  # Candle patterns need two bars
+    ring.upsert(columns['timestamp'][:first], {name: values[:first] for name, values in columns.items()})
+
+    # Fresh state for the day: this worker process is reused across days
+    bot.vwap_engines.clear()
+    bot.timeframe_aggregators.clear()
+    bot.indicator_engines.clear()
+    bot.positions = {}
+    bot.save_positions()
+    recorder = bot.dispatcher = RecordingDispatcher(bot)
+    alerts = {prefix: read_alerts(prefix, date, _worker['alert_dir']) for prefix in bot.alert_prefixes}
+    index = ReplayAlertIndex(bot.alert_prefixes, alerts, date, _worker['scratch'], ticker=symbol)
+    bot.alert_indexes = {symbol: index}
+    bot.decision_cache = DecisionCache(max_age=0)  # Replay time outruns the cache's clock: decide every tick
+    bot.send_to_xai = _worker['strategy']
+
+    scheduler = TickScheduler(bot.SESSION_WINDOWS, {})
+    force_close_at = session_time(datetime.strptime(date, '%Y-%m-%d').date(), bot.SESSION_EVENTS['force_close'][0])
+    force_closed = False
+    ticks = 0
+    output = sys.stdout if _worker['verbose'] else open(os.devnull, 'w')
+    with contextlib.redirect_stdout(output):
+        for i in range(first, len(frame)):
+            ring.upsert(columns['timestamp'][i:i + 1], {name: values[i:i + 1] for name, values in columns.items()})
+            now = times[i] + timedelta(minutes=1)  # Evaluated when the bar closes
+            if not scheduler.active('market', now):
+                continue
+            force_close = not force_closed and now >= force_close_at
+            force_closed = force_closed or force_close
+            price = float(frame['close'].iat[i])
+            recorder.time, recorder.price = now.strftime('%Y-%m-%d %H:%M'), price
+            index.clock = now
+            bot.process_tick(now, {symbol: price}, VIX, {symbol: ring}, FUNDAMENTALS, MACRO,
+                             scheduler.active('ai', now), force_close)
+            ticks += 1
+    if output is not sys.stdout:
+        output.close()
+
+    end_time = recorder.time
+    end_price = float(frame['close'].iat[-1]) if bars else None
+    trades = trades_from_orders(recorder.orders, end_time, end_price)
+    return {
+        'date': date,
+        'bars': bars,
+        'ticks': ticks,
+        'alerts': sum(len(a) for a in alerts.values()),
+        'orders': recorder.orders,
+        'trades': trades,
+        'pnl': round(sum(t['pnl'] for t in trades), 4),
+        'seconds': round(time.perf_counter() - start, 2),
+    }
+
+
+def replay(dates=None, archive_dir=ARCHIVE_DIR, alert_dir=ALERT_DIR, strategy='band_rules',
+           warmup_days=WARMUP_DAYS, workers=None, verbose=False, symbol=SYMBOL):
+    """Replay archived days of symbol (all of them by default) across a process pool; results in date order"""
+    days = archived_days(archive_dir)
+    dates = sorted(days) if dates is None else [d for d in dates if d in days]
+    repo_dir = os.path.dirname(os.path.abspath(__file__))
+    with tempfile.TemporaryDirectory(prefix='replay_') as scratch_root:
+        with ProcessPoolExecutor(workers, initializer=_init_worker,
+                                 initargs=(repo_dir, scratch_root, {d: [os.path.abspath(p) for p in paths] for d, paths in days.items()},
+                                           os.path.abspath(alert_dir), symbol, strategy, warmup_days, verbose)) as pool:
+            return list(pool.map(replay_day, dates))
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay archived sessions through the decision pipeline')
+    parser.add_argument('start', nargs='?', help='First date (YYYY-MM-DD); default: all archived days')
+    parser.add_argument('end', nargs='?', help='Last date, inclusive; default: start')
+    parser.add_argument('--symbol', default=SYMBOL, help='Symbol the archive holds; its alerts are picked by ticker')
+    parser.add_argument('--archive', default=ARCHIVE_DIR, help='Archived market data directory')
+    parser.add_argument('--alerts', default=ALERT_DIR, help='Directory holding the lux_*_<date> alert files')
+    parser.add_argument('--strategy', default='band_rules', help=f"{', '.join(STRATEGIES)} or module:function")
+    parser.add_argument('--warmup-days', type=int, default=WARMUP_DAYS)
+    parser.add_argument('--workers', type=int, default=None, help='Processes (default: one per CPU)')
+    parser.add_argument('--log', help='Write the trade log as JSON lines')
+    parser.add_argument('--verbose', action='store_true', help="Show bot.py's output")
+    args = parser.parse_args()
+
+    dates = None
+    if args.start:
+        end = args.end or args.start
+        dates = [d for d in sorted(archived_days(args.archive)) if args.start <= d <= end]
+    start = time.perf_counter()
+    results = replay(dates, args.archive, args.alerts, args.strategy, args.warmup_days, args.workers, args.verbose, args.symbol)
+    elapsed = time.perf_counter() - start
+
+    trades = [dict(t, date=r['date']) for r in results for t in r['trades']]
+    for r in results:
+        print(f"{r['date']}: {r['bars']} bars, {r['alerts']} alerts, {len(r['trades'])} trades, P&L {r['pnl']:+.2f} ({r['seconds']:.1f}s)")
+    wins = sum(1 for t in trades if t['pnl'] > 0)
+    print(f"{len(results)} days in {elapsed:.1f}s: {len(trades)} trades, "
+          f"{wins / len(trades) * 100 if trades else 0:.0f}% winners, P&L {sum(r['pnl'] for r in results):+.2f}")
+    if args.log:
+        with open(args.log, 'w') as f:
+            f.writelines(json.dumps(t) + '\n' for t in trades)
+        print(f"Trade log written to {args.log}")
+
+
+if __name__ == '__main__':
+    main()
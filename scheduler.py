@@ -0,0 +1,99 @@
+"""Drift-free, event-driven scheduler for the main loop.
+
+Bar ticks fire on 1-min bar-close boundaries (plus a short settle delay so
+the broker has the closed bar), computed from the clock rather than from
+the end of the previous tick, so work time never shifts the schedule.
+Session windows (market hours, AI window) open and close as scheduled
+events, one-shot events such as the noon force-close fire once a day, and
+trigger() wakes the loop for an off-cycle evaluation, e.g. when alerts are
+pushed. Each tick reports its jitter: how late it fired against its schedule.
+"""
+import threading
+import time
+from datetime import datetime, timedelta
+
+BAR_SECONDS = 60
+SETTLE = 2.0  # Seconds after the bar close before the tick fires
+
+
+class Tick:
+    def __init__(self, kind, scheduled, fired, events, reasons):
+        self.kind = kind  # 'bar' or 'trigger'
+        self.scheduled = scheduled
+        self.fired = fired
+        self.jitter = fired - scheduled
+        self.events = events  # One-shot events due at this tick
+        self.reasons = reasons  # What triggered an off-cycle tick
+
+    def __repr__(self):
+        return f"Tick({self.kind}, jitter={self.jitter * 1000:.0f}ms, events={self.events}, reasons={self.reasons})"
+
+
+def session_time(day, hhmm):
+    """datetime for HH:MM on day"""
+    hour, minute = map(int, hhmm.split(':'))
+    return datetime.combine(day, datetime.min.time()) + timedelta(hours=hour, minutes=minute)
+
+
+class TickScheduler:
+    """windows: {name: ('HH:MM', 'HH:MM')} half-open daily windows.
+    events: {name: ('HH:MM', catch_up)}; catch_up events still fire when the
+    scheduler starts after their time that day, others are skipped."""
+
+    def __init__(self, windows, events, bar_seconds=BAR_SECONDS, settle=SETTLE):
+        self.windows = windows
+        self.events = events
+        self.bar_seconds = bar_seconds
+        self.settle = settle
+        self._wake = threading.Event()
+        self._reasons = []
+        self._lock = threading.Lock()
+        self._next = None
+        now = datetime.now()
+        self._fired = {(now.date(), name) for name, (hhmm, catch_up) in events.items()
+                       if not catch_up and session_time(now.date(), hhmm) <= now}
+
+    def trigger(self, reason):
+        """Request an off-cycle tick (thread-safe)"""
+        with self._lock:
+            self._reasons.append(reason)
+        self._wake.set()
+
+    def next_boundary(self, after):
+        """First bar close + settle strictly after the epoch time `after`"""
+        boundary = (int((after - self.settle) // self.bar_seconds) + 1) * self.bar_seconds + self.settle
+        return boundary
+
+    def active(self, window, when=None):
+        when = when or datetime.now()
+        start, end = self.windows[window]
+        return session_time(when.date(), start) <= when < session_time(when.date(), end)
+
+    def _due_events(self):
+        now = datetime.now()
+        due = []
+        for name, (hhmm, _) in self.events.items():
+            key = (now.date(), name)
+            if key not in self._fired and session_time(now.date(), hhmm) <= now:
+                self._fired.add(key)
+                due.append(name)
+        return due
+
+    def wait(self):
+        """Block until the next bar close or trigger(); returns the Tick"""
+        if self._next is None:
+            self._next = self.next_boundary(time.time())
+        while True:
+            remaining = self._next - time.time()
+            if remaining > 0 and self._wake.wait(remaining):
+                with self._lock:
+                    reasons, self._reasons = self._reasons, []
+                    self._wake.clear()
+                if reasons:
+                    now = time.time()
+                    return Tick('trigger', now, now, self._due_events(), reasons)
+                continue
+            fired = time.time()
+            scheduled = self._next
+            self._next = self.next_boundary(fired)  # Skip any boundaries missed by an overrun
+            return Tick('bar', scheduled, fired, self._due_events(), [])
@@ -0,0 +1,98 @@
+"""TTL cache for slow-changing scraped values (fundamentals, macro).
+
+Each source has its own TTL, and values persist to scrape_cache.json across
+restarts. Once a value is stale it is still served immediately while a
+background thread refreshes it (stale-while-revalidate). A source that has
+never been fetched successfully serves its fallback, and that is recorded so
+it is visible when live data is not being used.
+"""
+import json
+import os
+import threading
+import time
+
+CACHE_FILE = 'scrape_cache.json'
+RETRY_AFTER = 300  # Seconds before retrying a source that is serving its fallback
+
+
+class ScrapeCache:
+    def __init__(self, path=CACHE_FILE, retry_after=RETRY_AFTER):
+        self.path = path
+        self.retry_after = retry_after
+        self._entries = self._load()  # name -> {'value', 'fetched_at', 'fallback', 'failed_at'}
+        self._fallbacks = {}  # name -> {'count', 'last_at'}: times the fallback was served
+        self._refreshing = set()
+        self._lock = threading.Lock()
+
+    def _load(self):
+        try:
+            with open(self.path, 'r') as f:
+                entries = json.load(f)
+            return entries if isinstance(entries, dict) else {}
+        except (FileNotFoundError, json.decoder.JSONDecodeError, ValueError):
+            return {}
+
+    def _save(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(self._entries, f)
+        os.replace(tmp, self.path)
+
+    def _fetch(self, name, fetch, fallback):
+        try:
+            entry = {'value': fetch(), 'fetched_at': time.time(), 'fallback': False}
+        except Exception as e:
+            print(f"Scrape of {name} failed: {e}")
+            with self._lock:
+                if name in self._entries and not self._entries[name]['fallback']:
+                    self._entries[name]['failed_at'] = time.time()
+                    return  # Keep serving the last live value
+                entry = {'value': fallback, 'fetched_at': time.time(), 'fallback': True}
+        with self._lock:
+            self._entries[name] = entry
+            self._save()
+
+    def _refresh(self, name, fetch, fallback):
+        try:
+            self._fetch(name, fetch, fallback)
+        finally:
+            with self._lock:
+                self._refreshing.discard(name)
+
+    def get(self, name, fetch, ttl, fallback):
+        """Cached value for name; fetch() is called when missing or older than ttl seconds"""
+        with self._lock:
+            entry = self._entries.get(name)
+        if entry is None:
+            self._fetch(name, fetch, fallback)  # First use: nothing to serve yet
+            with self._lock:
+                entry = self._entries[name]
+        else:
+            now = time.time()
+            max_age = self.retry_after if entry['fallback'] else ttl
+            retry_ok = now - entry.get('failed_at', 0) >= self.retry_after
+            if now - entry['fetched_at'] >= max_age and retry_ok:
+                with self._lock:
+                    start = name not in self._refreshing
+                    self._refreshing.add(name)
+                if start:
+                    threading.Thread(target=self._refresh, args=(name, fetch, fallback), name=f'scrape-{name}', daemon=True).start()
+        if entry['fallback']:
+            served = self._fallbacks.setdefault(name, {'count': 0, 'last_at': None})
+            served['count'] += 1
+            served['last_at'] = time.time()
+        return entry['value']
+
+    def status(self):
+        """Per-source age, whether the fallback is being served, and how often it was"""
+        now = time.time()
+        with self._lock:
+            return {
+                name: {
+                    'age_s': round(now - entry['fetched_at'], 1),
+                    'fallback': entry['fallback'],
+                    'fallback_served': self._fallbacks.get(name, {}).get('count', 0),
+                    'refreshing': name in self._refreshing,
+                }
+                for name, entry in self._entries.items()
+            }
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Production server for webhook.py: gunicorn with several worker processes.
+
+    python serve.py                                  # 0.0.0.0:80
+    python serve.py --bind 127.0.0.1:8080 --workers 4 --threads 16
+
+Each worker imports webhook.py after the fork, so it has its own alert writer
+thread; journal appends are flock'd O_APPEND writes, so workers never
+interleave lines. A TradingView burst that finds every thread busy waits in
+the listen backlog instead of being refused, and on shutdown each worker
+flushes its queue before exiting. Each worker writes its own metrics summary,
+and /metrics and /queue_stats add up all of them.
+"""
+import argparse
+import os
+
+from gunicorn.app.base import BaseApplication
+
+BIND = '0.0.0.0:80'
+WORKERS = min(4, (os.cpu_count() or 1) * 2)
+THREADS = 8  # Per worker; requests only parse and queue, so threads are cheap
+BACKLOG = 2048  # Pending connections held during bursts
+TIMEOUT = 30
+GRACEFUL_TIMEOUT = 15  # Time for a worker to finish requests and flush its queue
+
+
+def post_worker_init(worker):
+    import webhook
+    webhook.start_metrics_summary()
+
+
+def worker_exit(server, worker):
+    import webhook
+    webhook.writer.stop()
+    webhook.remove_metrics_summary()
+
+
+class WebhookServer(BaseApplication):
+    def __init__(self, options):
+        self.options = options
+        super().__init__()
+
+    def load_config(self):
+        for key, value in self.options.items():
+            self.cfg.set(key, value)
+
+    def load(self):
+        import webhook  # In the worker: each gets its own writer thread
+        return webhook.app
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run webhook.py under gunicorn')
+    parser.add_argument('--bind', default=BIND)
+    parser.add_argument('--workers', type=int, default=WORKERS)
+    parser.add_argument('--threads', type=int, default=THREADS)
+    args = parser.parse_args()
+    WebhookServer({
+        'bind': args.bind,
+        'workers': args.workers,
+        'worker_class': 'gthread',
+        'threads': args.threads,
+        'backlog': BACKLOG,
+        'timeout': TIMEOUT,
+        'graceful_timeout': GRACEFUL_TIMEOUT,
+        'preload_app': False,  # Threads started before the fork wouldn't exist in the workers
+        'post_worker_init': post_worker_init,
+        'worker_exit': worker_exit,
+    }).run()
+
+
+if __name__ == '__main__':
+    main()
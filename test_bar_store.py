@@ -0,0 +1,137 @@
+"""BarCache against a local stub Tradier server (python -m pytest test_bar_store.py).
+
+The stub serves /markets/history from an editable list of bars and logs each
+request, and bot.fetch_tradier_history is pointed at it through
+TRADIER_BASE_URL, so the real request and parsing path is exercised.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+import bot
+from bar_store import BarCache
+
+
+class StubTradier(BaseHTTPRequestHandler):
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k: v[0] for k, v in parse_qs(url.query).items()}
+        self.server.requests.append(params)
+        time.sleep(self.server.delay)
+        if url.path != '/markets/history':
+            self.send_error(404)
+            return
+        start, end = params['start'].replace(' ', 'T'), params['end'].replace(' ', 'T')
+        bars = [b for b in self.server.bars if start <= b['date'][:len(start)] and b['date'][:len(end)] <= end]
+        body = json.dumps({'history': {'day': bars[0] if len(bars) == 1 else bars} if bars else None}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def tradier(monkeypatch):
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubTradier)
+    server.bars, server.requests, server.delay = [], [], 0.0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(bot, 'TRADIER_BASE_URL', f'http://127.0.0.1:{server.server_address[1]}')
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def make_bar(when, close):
+    return {'date': when.strftime('%Y-%m-%dT%H:%M:%S'), 'open': close - 0.1, 'high': close + 0.2,
+            'low': close - 0.2, 'close': close, 'volume': 1000}
+
+
+def minutes(n, start=None):
+    start = start or datetime.now().replace(hour=9, minute=30, second=0, microsecond=0) - timedelta(days=1)
+    return [make_bar(start + timedelta(minutes=i), 450 + i) for i in range(n)]
+
+
+def stored_lines(cache, symbol='SPY', interval='1min'):
+    with open(cache._path(symbol, interval), 'r') as f:
+        return [json.loads(line) for line in f]
+
+
+def test_first_fetch_covers_lookback_then_only_delta(tradier, tmp_path):
+    tradier.bars = minutes(3)
+    cache = BarCache(bot.fetch_tradier_history, base_dir=tmp_path)
+    assert cache.get('SPY', '1min') == tradier.bars
+    assert tradier.requests[-1]['start'] == cache._cutoff()
+
+    tradier.bars += minutes(5)[3:]
+    assert cache.get('SPY', '1min') == tradier.bars
+    last_stored = datetime.fromisoformat(tradier.bars[2]['date'])
+    assert tradier.requests[-1]['start'] == last_stored.strftime('%Y-%m-%d %H:%M')
+    assert tradier.requests[-1]['symbol'] == 'SPY' and tradier.requests[-1]['interval'] == '1min'
+    assert stored_lines(cache) == tradier.bars
+
+
+def test_forming_last_bar_is_replaced(tradier, tmp_path):
+    tradier.bars = minutes(3)
+    cache = BarCache(bot.fetch_tradier_history, base_dir=tmp_path)
+    cache.get('SPY', '1min')
+
+    tradier.bars[-1] = dict(tradier.bars[-1], close=999.0, volume=5000)
+    bars = cache.get('SPY', '1min')
+    assert len(bars) == 3 and bars[-1]['close'] == 999.0 and bars[-1]['volume'] == 5000
+    # Older bars are final: the cache only asks for bars from its last one on
+    tradier.bars[0] = dict(tradier.bars[0], close=1.0)
+    assert cache.get('SPY', '1min')[0]['close'] == 450
+
+    reloaded = BarCache(bot.fetch_tradier_history, base_dir=tmp_path)
+    tradier.bars = []
+    assert reloaded.get('SPY', '1min') == bars
+
+
+def test_bars_past_lookback_are_trimmed(tradier, tmp_path):
+    now = datetime.now().replace(second=0, microsecond=0)
+    old = minutes(2, now - timedelta(days=40))
+    recent = minutes(2, now - timedelta(days=2))
+    tradier.bars = old + recent
+    cache = BarCache(bot.fetch_tradier_history, base_dir=tmp_path, lookback_days=60)
+    assert cache.get('SPY', '1min') == old + recent
+
+    cache.lookback_days = 30
+    assert cache.get('SPY', '1min') == recent
+    assert stored_lines(cache) == recent
+
+
+def test_store_is_compacted_on_reload(tradier, tmp_path):
+    bars = minutes(3)
+    cache = BarCache(bot.fetch_tradier_history, base_dir=tmp_path, lookback_days=30)
+    corrected = dict(bars[-1], close=500.0)
+    stale = make_bar(datetime.now() - timedelta(days=45), 400)
+    with open(cache._path('SPY', '1min'), 'w') as f:
+        for bar in [stale] + bars + [corrected]:
+            f.write(json.dumps(bar) + '\n')
+        f.write('{"date": "2025-')  # Cut off mid-write
+
+    expected = bars[:-1] + [corrected]
+    assert cache.get('SPY', '1min') == expected
+    assert stored_lines(cache) == expected
+
+
+def test_symbols_refresh_concurrently(tradier, tmp_path):
+    tradier.bars = minutes(3)
+    tradier.delay = 0.5
+    cache = BarCache(bot.fetch_tradier_history, base_dir=tmp_path)
+    symbols = ['SPY', 'QQQ', 'IWM', 'DIA']
+    start = time.perf_counter()
+    with ThreadPoolExecutor(len(symbols)) as pool:
+        results = list(pool.map(lambda symbol: cache.get(symbol, '1min'), symbols))
+    assert time.perf_counter() - start < 2 * tradier.delay  # Not one after another
+    assert results == [tradier.bars] * len(symbols)
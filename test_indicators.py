@@ -0,0 +1,144 @@
+"""Streaming indicators and anchored VWAP against full recomputations (python -m pytest test_indicators.py).
+
+Every bar is fed twice, first as a partial bar and then revised to its final
+values, as the live loop sees the still-forming last bar.
+"""
+import numpy as np
+import pandas as pd
+
+from indicators import AnchoredVWAP, StreamingIndicators
+
+TOLERANCE = 1e-9
+
+
+def make_bars(n, seed=0, start='2025-12-01 09:30'):
+    rng = np.random.default_rng(seed)
+    close = 450 + np.cumsum(rng.normal(0, 0.3, n))
+    open_ = close + rng.normal(0, 0.1, n)
+    high = np.maximum(open_, close) + rng.uniform(0, 0.3, n)
+    low = np.minimum(open_, close) - rng.uniform(0, 0.3, n)
+    dates = pd.date_range(start, periods=n, freq='min').strftime('%Y-%m-%dT%H:%M:%S')
+    return pd.DataFrame({'date': dates, 'open': open_, 'high': high, 'low': low, 'close': close,
+                         'volume': rng.integers(100, 5000, n).astype(float)})
+
+
+def partial(bar, rng):
+    """The bar as fetched while still forming"""
+    close = bar['close'] + rng.normal(0, 0.2)
+    return {**bar, 'high': max(bar['high'], close), 'low': min(bar['low'], close), 'close': close,
+            'volume': bar['volume'] * rng.uniform(0.1, 0.9)}
+
+
+def seeded_ewm(values, n, **ewm):
+    """EWM seeded with the mean of the first n values, NaN before that"""
+    seed = pd.Series([values.iloc[:n].mean()], index=[values.index[n - 1]])
+    smoothed = pd.concat([seed, values.iloc[n:]]).ewm(adjust=False, **ewm).mean()
+    return smoothed.reindex(values.index)
+
+
+def reference_indicators(df):
+    """Full-history RSI(14), MACD(12, 26, 9), ATR(14) and EMA(21) in pandas"""
+    close, high, low = df['close'], df['high'], df['low']
+    diff = close.diff().fillna(0.0)
+    up = diff.clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    dn = (-diff).clip(lower=0).ewm(alpha=1 / 14, adjust=False).mean()
+    rsi = (100 - 100 / (1 + up / dn)).where(np.arange(len(df)) >= 13)
+
+    macd = close.ewm(span=12, adjust=False).mean() - close.ewm(span=26, adjust=False).mean()
+    macd = macd.where(np.arange(len(df)) >= 25)
+    signal = macd.dropna().ewm(span=9, adjust=False).mean().reindex(df.index)
+    signal = signal.where(np.arange(len(df)) >= 25 + 8)
+
+    prev = close.shift()
+    tr = pd.concat([high - low, (high - prev).abs(), (low - prev).abs()], axis=1).max(axis=1)
+    atr = seeded_ewm(tr, 14, alpha=1 / 14)
+    ema = seeded_ewm(close, 21, span=21)
+    return pd.DataFrame({'rsi': rsi, 'macd': macd, 'macd_signal': signal, 'macd_hist': macd - signal,
+                         'atr': atr, 'ema_21': ema})
+
+
+def assert_close(actual, expected):
+    actual, expected = np.asarray(actual, dtype=float), np.asarray(expected, dtype=float)
+    assert np.array_equal(np.isnan(actual), np.isnan(expected))
+    assert np.nanmax(np.abs(actual - expected), initial=0.0) < TOLERANCE
+
+
+def test_streaming_indicators_match_full_recomputation():
+    df = make_bars(3000)
+    rng = np.random.default_rng(1)
+    engine = StreamingIndicators()
+    rows = []
+    for bar in df.to_dict('records'):
+        forming = partial(bar, rng)
+        engine.update(forming['date'], forming['high'], forming['low'], forming['close'])
+        rows.append(engine.update(bar['date'], bar['high'], bar['low'], bar['close']))
+    streamed = pd.DataFrame(rows)
+    expected = reference_indicators(df)
+    for name in expected:
+        assert_close(streamed[name], expected[name])
+
+
+def test_older_bars_are_ignored_and_warm_start_matches():
+    df = make_bars(200)
+    engine = StreamingIndicators()
+    values = engine.warm_start(df['date'], df['high'], df['low'], df['close'])
+    assert engine.update(df['date'].iat[10], 1.0, 1.0, 1.0) == values
+    expected = reference_indicators(df).iloc[-1]
+    for name, value in values.items():
+        assert_close([value], [expected[name]])
+
+
+def reference_vwap(df, anchor='09:33', band_len=20, slope_len=10):
+    """Per-bar session VWAP, rolling-std bands and polyfit slope, recomputed per day
+    from the anchor on (bars before the first traded volume have no VWAP)"""
+    result = pd.DataFrame(np.nan, index=df.index, columns=['vwap', 'sd', 'slope'])
+    for _, day in df.groupby(df['date'].str[:10]):
+        day = day[day['date'].str[11:16] >= anchor]
+        day = day[day['volume'].cumsum() > 0]
+        tp = (day['high'] + day['low'] + day['close']) / 3
+        vwap = (tp * day['volume']).cumsum() / day['volume'].cumsum()
+        result.loc[day.index, 'vwap'] = vwap
+        result.loc[day.index, 'sd'] = (tp - vwap).rolling(band_len).std()
+        for i in range(1, len(day)):
+            recent = vwap.iloc[max(0, i + 1 - slope_len):i + 1]
+            result.loc[day.index[i], 'slope'] = np.polyfit(range(len(recent)), recent, 1)[0]
+    return result
+
+
+def stream_vwap(df, seed=1):
+    rng = np.random.default_rng(seed)
+    engine = AnchoredVWAP('09:33')
+    rows = []
+    for bar in df.to_dict('records'):
+        forming = partial(bar, rng)
+        engine.update(forming['date'], forming['high'], forming['low'], forming['close'], forming['volume'])
+        row, slope = engine.update(bar['date'], bar['high'], bar['low'], bar['close'], bar['volume'])
+        rows.append({'vwap': row['vwap'], 'sd': row['sd'], 'slope': slope,
+                     'upper3': row['upper3'], 'lower2': row['lower2']})
+    return pd.DataFrame(rows)
+
+
+def two_sessions():
+    return pd.concat([make_bars(390, seed=2, start='2025-12-01 09:30'),
+                      make_bars(390, seed=3, start='2025-12-02 09:30')], ignore_index=True)
+
+
+def test_anchored_vwap_matches_full_recomputation():
+    df = two_sessions()
+    streamed, expected = stream_vwap(df), reference_vwap(df)
+    for name in expected:
+        assert_close(streamed[name], expected[name])
+    assert_close(streamed['upper3'], expected['vwap'] + 3 * expected['sd'])
+    assert_close(streamed['lower2'], expected['vwap'] - 2 * expected['sd'])
+
+
+def test_anchored_vwap_recovers_from_zero_volume_at_anchor():
+    df = two_sessions()
+    anchored = df.index[df['date'].str[11:16] >= '09:33']
+    df.loc[anchored[:2], 'volume'] = 0.0  # No trades in the first anchored bars of day one
+    df.loc[anchored[30], 'volume'] = 0.0  # Nor in a later one
+    streamed, expected = stream_vwap(df), reference_vwap(df)
+    for name in expected:
+        assert_close(streamed[name], expected[name])
+    recovered = slice(anchored[40], 390)  # Rest of day one
+    assert streamed['sd'].iloc[recovered].notna().all() and streamed['slope'].iloc[recovered].notna().all()
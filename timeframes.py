@@ -0,0 +1,74 @@
+"""Higher-timeframe bars built incrementally from the 1-min ring.
+
+Each configured timeframe (3/5/10/15/30min, 1h by default) is a BarRing of
+its own. update() re-aggregates only the buckets the newest 1-min bars fall
+in, so a tick costs at most one bucket's worth of 1-min bars per timeframe,
+and the in-progress bucket is kept as a partial bar that is revised as its
+minutes arrive (like a broker's history including the forming bar).
+Buckets are aligned to the 09:30 session open, as TradingView aligns them,
+so a 1h bar runs 09:30-10:30.
+"""
+import numpy as np
+
+from bar_ring import BarRing
+
+TIMEFRAMES = (3, 5, 10, 15, 30, 60)  # Minutes
+SESSION_OPEN = 9 * 3600 + 30 * 60  # Seconds after midnight
+
+
+def bucket_starts(timestamps, minutes):
+    """Start of the timeframe bucket holding each bar timestamp"""
+    size = minutes * 60
+    offset = SESSION_OPEN % size
+    return (np.asarray(timestamps) - offset) // size * size + offset
+
+
+def aggregate(rows, minutes):
+    """(timestamps, {column: array}) of the buckets covering 1-min rows (oldest first)"""
+    buckets = bucket_starts(rows['timestamp'], minutes)
+    if not len(buckets):
+        return buckets, {}
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)] - 1
+    return buckets[starts], {
+        'open': rows['open'][starts],
+        'high': np.maximum.reduceat(rows['high'], starts),
+        'low': np.minimum.reduceat(rows['low'], starts),
+        'close': rows['close'][ends],
+        'volume': np.add.reduceat(rows['volume'], starts, dtype=np.float64),
+    }
+
+
+class TimeframeAggregator:
+    def __init__(self, timeframes=TIMEFRAMES, capacity=None):
+        self.timeframes = tuple(timeframes)
+        self.capacity = capacity
+        self.rings = None  # Sized from the 1-min ring on the first update
+        self.base = None
+        self.last_timestamp = None  # Newest 1-min bar aggregated so far
+
+    def update(self, bars):
+        """Fold the 1-min bars written since the last update into every timeframe"""
+        if self.rings is None:
+            capacity = self.capacity or bars.capacity
+            self.rings = {tf: BarRing(capacity=capacity // tf + 1, derived=()) for tf in self.timeframes}
+        self.base = bars
+        if not len(bars):
+            return self
+        for tf, ring in self.rings.items():
+            # The last bar seen may have been revised since, so its bucket is rebuilt too
+            start = bucket_starts(self.last_timestamp, tf) if self.last_timestamp is not None else None
+            timestamps, values = aggregate(bars.since(start), tf)
+            ring.upsert(timestamps, values)
+        self.last_timestamp = bars.last_timestamp()
+        return self
+
+    def __getitem__(self, minutes):
+        """Bars of a timeframe in minutes; 1 is the 1-min ring itself"""
+        return self.base if minutes == 1 else self.rings[minutes]
+
+    def partial(self, minutes):
+        """Whether the newest bar of a timeframe is still forming"""
+        if minutes == 1 or self.last_timestamp is None:
+            return False
+        return bool(bucket_starts(self.last_timestamp, minutes) + minutes * 60 > self.last_timestamp + 60)
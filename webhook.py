@@ -1,33 +1,79 @@
 #!/usr/bin/env python3
-from flask import Flask, request, jsonify, abort
+from flask import Flask, request, jsonify, abort, g, Response
+import atexit
 import json
 from datetime import datetime
 import os
+import signal
+import sys
+import time
+
+from alert_push import AlertPublisher
+from journal import AlertJournal, AlertWriter, decode_alert
+from metrics import Timings, merge_summaries, read_summary, read_worker_summaries, render_prometheus, start_summary_writer
 
 app = Flask(__name__)
 
-# TradingView official webhook IPs — whitelist
-ALLOWED_IPS = [
+ALERT_DIR = '/home/ryan_tischer/bot'
+DEBUG = os.environ.get('WEBHOOK_DEBUG') == '1'  # Print every raw payload and parsed alert
+DEFAULT_TICKER = 'SPY'  # For plain-text alerts whose webhook URL has no ?ticker=
+journal = AlertJournal(ALERT_DIR)
+
+# Routes only queue alerts; one writer thread owns all journal writes and
+# pushes each flushed batch to bot.py
+publisher = AlertPublisher()
+writer = AlertWriter(journal, on_flush=publisher.publish).start()
+atexit.register(writer.stop)
+
+# Per-route latency (parse, queue, whole request). Every worker process writes
+# its summary to metrics_webhook_<pid>.json; /metrics merges them all with
+# bot.py's summary
+timings = Timings()
+METRICS_PREFIX = os.path.join(ALERT_DIR, 'metrics_webhook')
+METRICS_INTERVAL = 15  # Seconds; how stale the other workers' numbers can be
+BOT_METRICS_FILE = os.path.join(ALERT_DIR, 'metrics_bot.json')
+WRITER_MAX_STATS = frozenset({'last_flush_ms', 'max_flush_ms'})  # Taken as the max across workers, the rest add up
+
+# TradingView official webhook IPs — whitelist (sets: one hash lookup per request)
+ALLOWED_IPS = frozenset({
     '52.89.214.238',
     '34.212.75.30',
     '54.218.53.128',
     '52.32.178.7'
-]
+})
+
+# Status endpoints reachable from the box itself only
+LOCAL_IPS = frozenset({'127.0.0.1', '::1'})
+LOCAL_ENDPOINTS = frozenset({'queue_stats', 'metrics'})
 
 def check_ip():
     client_ip = request.remote_addr
+    if request.endpoint in LOCAL_ENDPOINTS and client_ip in LOCAL_IPS:
+        return
     if client_ip not in ALLOWED_IPS:
         print(f"Blocked unauthorized IP: {client_ip}")
         abort(403)
 
 @app.before_request
 def limit_remote_addr():
+    g.start = time.perf_counter()
     check_ip()
 
+@app.after_request
+def record_latency(response):
+    if 'start' in g and request.endpoint:
+        timings.record(f'route_{request.endpoint}', time.perf_counter() - g.start)
+    return response
+
 def parse_payload():
     """Parse both proper JSON and TradingView's text/plain payloads"""
+    with timings.time('parse'):
+        return _parse_payload()
+
+def _parse_payload():
     raw = request.data.decode('utf-8', errors='ignore').strip()
-    print(f"RAW PAYLOAD ({len(raw)} chars): {raw}")
+    if DEBUG:
+        print(f"RAW PAYLOAD ({len(raw)} chars): {raw}")
 
     if not raw:
         print("ERROR: Empty payload received")
@@ -35,45 +81,36 @@ def parse_payload():
 
     # Try parsing as JSON directly (this works for 99% of your real alerts)
     try:
-        parsed = json.loads(raw)
-        print(f"Successfully parsed JSON: {parsed}")
+        parsed = decode_alert(raw)
+        if DEBUG:
+            print(f"Successfully parsed JSON: {parsed}")
         return parsed
     except json.JSONDecodeError as e:
-        print(f"JSON decode error: {e}")
-        pass
+        if DEBUG:
+            print(f"JSON decode error: {e}")
 
     # Fallback: some LuxAlgo alerts send just a plain string
-    # Example: "Within Bullish Block"
+    # Example: "Within Bullish Block" (the ticker then comes from the URL, e.g. /lux_exits?ticker=QQQ)
     if raw and raw[0] not in ['{', '[']:
         fallback = {
             "alert": raw.strip(),
-            "ticker": "SPY",
+            "ticker": request.args.get('ticker', DEFAULT_TICKER),
             "tf": "unknown",
             "bartime": int(datetime.now().timestamp() * 1000)
         }
-        print(f"Using fallback format: {fallback}")
+        if DEBUG:
+            print(f"Using fallback format: {fallback}")
         return fallback
 
     print(f"ERROR: Could not parse payload: {raw[:200]}")
     return None
 
 def save_alert(data, prefix):
-    today = datetime.now().strftime('%Y-%m-%d')
-    filename = f'{prefix}_{today}.json'
-    path = os.path.join('/home/ryan_tischer/bot', filename)
-
-    if os.path.exists(path):
-        with open(path, 'r') as f:
-            alerts = json.load(f)
-    else:
-        alerts = []
-
-    alerts.append(data)
-
-    with open(path, 'w') as f:
-        json.dump(alerts, f, indent=2)
-
-    print(f"Saved to {filename} — total alerts: {len(alerts)}")
+    """Queue one alert for today's <prefix>_<date>.jsonl journal"""
+    with timings.time('save'):
+        writer.put(prefix, data)
+    if DEBUG:
+        print(f"Queued {prefix} alert — queue depth: {writer.depth()}")
 
 @app.route('/lux_oscillator', methods=['POST'])
 def lux_oscillator():
@@ -107,6 +144,55 @@ def lux_exits():
     save_alert(data, 'lux_exits')
     return jsonify({'status': 'success'}), 200
 
+def metrics_file():
+    return f'{METRICS_PREFIX}_{os.getpid()}.json'
+
+def worker_summaries():
+    """{pid: {'stages', 'gauges'}} of every live worker; this one's is current"""
+    summaries = read_worker_summaries(METRICS_PREFIX)
+    summaries[os.getpid()] = {'stages': timings.summary(samples=True), 'gauges': writer.stats()}
+    return summaries
+
+def merge_writer_stats(stats):
+    merged = {}
+    for worker in stats:
+        for k, v in worker.items():
+            merged[k] = max(merged.get(k, v), v) if k in WRITER_MAX_STATS else merged.get(k, 0) + v
+    return merged
+
+@app.route('/queue_stats', methods=['GET'])
+def queue_stats():
+    workers = {pid: summary.get('gauges', {}) for pid, summary in worker_summaries().items()}
+    return jsonify(dict(merge_writer_stats(workers.values()), workers=workers)), 200
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    workers = worker_summaries()
+    gauges = {f'writer_{k}': v for k, v in merge_writer_stats(w.get('gauges', {}) for w in workers.values()).items()}
+    gauges['workers'] = len(workers)
+    body = render_prometheus('webhook', merge_summaries(w['stages'] for w in workers.values()), gauges)
+    bot = read_summary(BOT_METRICS_FILE)
+    if bot:
+        gauges = dict(bot.get('gauges', {}), summary_age_seconds=round(time.time() - bot['updated_at'], 1))
+        body += render_prometheus('bot', bot['stages'], gauges)
+    return Response(body, mimetype='text/plain; version=0.0.4')
+
+def start_metrics_summary():
+    return start_summary_writer(metrics_file(), lambda: (timings.summary(samples=True), {'gauges': writer.stats()}),
+                                METRICS_INTERVAL)
+
+def remove_metrics_summary():
+    """Drop this worker's summary file so /metrics stops counting it"""
+    try:
+        os.remove(metrics_file())
+    except FileNotFoundError:
+        pass
+
 if __name__ == '__main__':
+    # Development server; production runs under serve.py (gunicorn workers)
+    # systemd stops the service with SIGTERM; exit normally so atexit flushes the queue
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    start_metrics_summary()
+    atexit.register(remove_metrics_summary)
     # Runs on port 80 with capabilities (set via setcap) or via systemd as root
     app.run(host='0.0.0.0', port=80)